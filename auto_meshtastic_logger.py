@@ -17,7 +17,7 @@ Usage:
     python3 auto_meshtastic_logger.py --interval 300 --serial /dev/ttyACM0 --outdir monitoring
 """
 import argparse
-import json
+import os
 import signal
 import subprocess
 import sys
@@ -29,8 +29,8 @@ from typing import Dict, List, Optional, Set
 from core import (
     discover_all_nodes, collect_nodes_detailed, normalize_node_id,
     collect_telemetry_batch, collect_traceroute_batch,
-    setup_telemetry_csv, setup_traceroute_csv,
-    iso_now, append_row
+    setup_telemetry_csv, setup_traceroute_csv, TELEMETRY_FIELDS,
+    iso_now, append_rows, write_atomic, dump_json
 )
 
 
@@ -50,10 +50,12 @@ class AutoMeshtasticLogger:
         # Setup output structure
         self.run_dir.mkdir(parents=True, exist_ok=True)
         
-        # Create or update "latest" symlink
-        if self.latest_link.is_symlink():
-            self.latest_link.unlink()
-        self.latest_link.symlink_to(self.run_dir.name)
+        # Create or update "latest" symlink with a single atomic rename
+        tmp_link = base_dir / ".latest.tmp"
+        if tmp_link.is_symlink():
+            tmp_link.unlink()
+        tmp_link.symlink_to(self.run_dir.name)
+        os.replace(tmp_link, self.latest_link)
         
         self.tele_csv = self.run_dir / "telemetry.csv"
         self.trace_csv = self.run_dir / "traceroute.csv"
@@ -107,9 +109,10 @@ class AutoMeshtasticLogger:
             "node_completion_times": {k: v.isoformat() for k, v in self.node_completion_time.items()}
         }
         
+        # Written every cycle: serialize straight to bytes (orjson when
+        # installed) and swap the file in atomically
         try:
-            with open(self.stats_json, 'w') as f:
-                json.dump(stats, f, indent=2)
+            write_atomic(self.stats_json, dump_json(stats, indent=True))
         except Exception as e:
             print(f"[WARN] Could not save stats: {e}", file=sys.stderr)
     
@@ -194,37 +197,16 @@ class AutoMeshtasticLogger:
         print(f"[INFO] Collecting telemetry from {len(current_nodes)} nodes...")
         telemetry_data = collect_telemetry_batch(current_nodes, self.args.serial, timeout=30)
         
-        # Log telemetry to CSV
+        # Log telemetry to CSV, written in one append once all nodes are collected
         telemetry_collected = 0
+        rows = []
         for node_id, tele in telemetry_data.items():
             if tele:  # Only log if we got actual data
-                append_row(self.tele_csv, [
-                    cycle_ts, node_id,
-                    # Basic device metrics
-                    tele.get("battery_pct", ""),
-                    tele.get("voltage_v", ""),
-                    tele.get("channel_util_pct", ""),
-                    tele.get("air_tx_pct", ""),
-                    tele.get("uptime_s", ""),
-                    # Environment sensors
-                    tele.get("temperature_c", ""),
-                    tele.get("humidity_pct", ""),
-                    tele.get("pressure_hpa", ""),
-                    tele.get("iaq", ""),
-                    tele.get("lux", ""),
-                    # Power monitoring
-                    tele.get("current_ma", ""),
-                    tele.get("ch1_voltage_v", ""),
-                    tele.get("ch1_current_ma", ""),
-                    tele.get("ch2_voltage_v", ""),
-                    tele.get("ch2_current_ma", ""),
-                    tele.get("ch3_voltage_v", ""),
-                    tele.get("ch3_current_ma", ""),
-                    tele.get("ch4_voltage_v", ""),
-                    tele.get("ch4_current_ma", "")
-                ])
+                get = tele.get
+                rows.append([cycle_ts, node_id] + [get(field, "") for field in TELEMETRY_FIELDS])
                 self.node_telemetry_count[node_id] = self.node_telemetry_count.get(node_id, 0) + 1
                 telemetry_collected += 1
+        append_rows(self.tele_csv, rows)
         
         self.total_telemetry_collected += telemetry_collected
         print(f"[INFO] Collected telemetry from {telemetry_collected} nodes")
@@ -235,19 +217,15 @@ class AutoMeshtasticLogger:
             print(f"[INFO] Running traceroutes to {len(current_nodes)} nodes...")
             traceroute_data = collect_traceroute_batch(current_nodes, self.args.serial, timeout=45)
             
-            # Log traceroute to CSV
-            for dest, traces in traceroute_data.items():
-                for trace in traces:
-                    append_row(self.trace_csv, [
-                        cycle_ts,
-                        trace.get("dest", dest),
-                        trace.get("direction", ""),
-                        trace.get("hop_index", ""),
-                        trace.get("from", ""),
-                        trace.get("to", ""),
-                        trace.get("link_db", "")
-                    ])
-                    traceroutes_collected += 1
+            # Log traceroute to CSV, all hops in one append. Each result maps
+            # "forward"/"back" to (from, to, dB) hop tuples.
+            rows = []
+            for dest, routes in traceroute_data.items():
+                for key, direction in (("forward", "forward"), ("back", "backward")):
+                    for hop_index, (src, dst, link_db) in enumerate(routes.get(key, ())):
+                        rows.append([cycle_ts, dest, direction, hop_index, src, dst, link_db])
+            traceroutes_collected = len(rows)
+            append_rows(self.trace_csv, rows)
             
             self.total_traceroutes += traceroutes_collected
             print(f"[INFO] Collected {traceroutes_collected} traceroute hops")
@@ -2,16 +2,16 @@
 Core modules for Meshtastic telemetry logger.
 """
 
-from .cli_utils import run_cli, validate_node_id, validate_serial_device, build_meshtastic_command
-from .csv_utils import iso_now, ensure_header, append_row, setup_telemetry_csv, setup_traceroute_csv
+from .cli_utils import run_cli, iter_cli_lines, terminate_running_commands, validate_node_id, validate_serial_device, build_meshtastic_command
+from .csv_utils import iso_now, ensure_header, append_row, append_rows, write_atomic, dump_json, load_json, setup_telemetry_csv, setup_traceroute_csv, TELEMETRY_FIELDS
 from .node_discovery import discover_all_nodes, collect_nodes_detailed, normalize_node_id
 from .telemetry import collect_telemetry_cli, collect_telemetry_batch
 from .traceroute import collect_traceroute_cli, collect_traceroute_batch, extract_unique_links, get_network_topology
 from .config import LoggerConfig, DEFAULT_CONFIG
 
 __all__ = [
-    'run_cli', 'validate_node_id', 'validate_serial_device', 'build_meshtastic_command',
-    'iso_now', 'ensure_header', 'append_row', 'setup_telemetry_csv', 'setup_traceroute_csv',
+    'run_cli', 'iter_cli_lines', 'terminate_running_commands', 'validate_node_id', 'validate_serial_device', 'build_meshtastic_command',
+    'iso_now', 'ensure_header', 'append_row', 'append_rows', 'write_atomic', 'dump_json', 'load_json', 'setup_telemetry_csv', 'setup_traceroute_csv', 'TELEMETRY_FIELDS',
     'discover_all_nodes', 'collect_nodes_detailed', 'normalize_node_id',
     'collect_telemetry_cli', 'collect_telemetry_batch',
     'collect_traceroute_cli', 'collect_traceroute_batch', 'extract_unique_links', 'get_network_topology',
@@ -2,10 +2,19 @@
 """
 CLI utilities for running meshtastic commands safely.
 """
+import string
 import subprocess
-import re
 import sys
-from typing import List, Tuple, Optional
+import threading
+from typing import Iterator, List, Tuple, Optional
+
+
+# Commands started by run_cli that have not finished yet, so a shutdown can
+# stop them instead of waiting out their timeout. Only touched with single
+# set operations, which keeps it safe to use from a signal handler.
+_running_procs = set()
+# Set by terminate_running_commands(); run_cli starts no new commands after it
+_stopping = False
 
 
 def run_cli(cmd: List[str], timeout: int = 30) -> Tuple[bool, str]:
@@ -23,21 +32,121 @@ def run_cli(cmd: List[str], timeout: int = 30) -> Tuple[bool, str]:
     if not isinstance(cmd, list) or not cmd:
         return False, "[INVALID_CMD]"
     
+    if _stopping:
+        return False, "[STOPPED]"
+    
     try:
-        out = subprocess.check_output(
+        proc = subprocess.Popen(
             cmd, 
+            stdout=subprocess.PIPE, 
             stderr=subprocess.STDOUT, 
             text=True, 
-            timeout=timeout, 
             shell=False
         )
-        return True, out
-    except subprocess.CalledProcessError as e:
-        return False, e.output if e.output else "[PROCESS_ERROR]"
+    except Exception as e:
+        return False, f"[ERROR]: {str(e)}"
+    
+    _running_procs.add(proc)
+    try:
+        out, _ = proc.communicate(timeout=timeout)
     except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
         return False, "[TIMEOUT]"
     except Exception as e:
         return False, f"[ERROR]: {str(e)}"
+    finally:
+        if proc.poll() is None:
+            # Interrupted before the command finished, e.g. by Ctrl+C
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        _running_procs.discard(proc)
+    
+    if proc.returncode != 0:
+        return False, out if out else "[PROCESS_ERROR]"
+    return True, out
+
+
+def iter_cli_lines(cmd: List[str], timeout: int = 30) -> Iterator[str]:
+    """
+    Run a CLI command like run_cli, yielding its output lines as they arrive.
+    
+    The caller can parse while the command is still running, and only one
+    line is held at a time. The command is killed once timeout expires.
+    
+    Args:
+        cmd: Command as list of strings (no shell injection)
+        timeout: Command timeout in seconds
+        
+    Yields:
+        Output lines, including their line endings
+        
+    Raises:
+        RuntimeError: If the command cannot start, times out, is stopped or
+            exits with a non-zero status; the message uses run_cli's markers
+    """
+    if not isinstance(cmd, list) or not cmd:
+        raise RuntimeError("[INVALID_CMD]")
+    
+    if _stopping:
+        raise RuntimeError("[STOPPED]")
+    
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            shell=False
+        )
+    except Exception as e:
+        raise RuntimeError(f"[ERROR]: {e}") from e
+    
+    timed_out = threading.Event()
+    
+    def kill_on_timeout():
+        timed_out.set()
+        proc.kill()
+    
+    _running_procs.add(proc)
+    timer = threading.Timer(timeout, kill_on_timeout)
+    timer.daemon = True
+    try:
+        timer.start()
+        yield from proc.stdout
+        proc.wait()
+    finally:
+        timer.cancel()
+        if proc.poll() is None:
+            # The caller stopped iterating early or was interrupted
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        _running_procs.discard(proc)
+    
+    if timed_out.is_set():
+        raise RuntimeError("[TIMEOUT]")
+    if proc.returncode != 0:
+        raise RuntimeError("[PROCESS_ERROR]")
+
+
+def terminate_running_commands() -> None:
+    """
+    Terminate all commands currently running under run_cli.
+    
+    Intended for shutdown handlers: the interrupted run_cli calls return a
+    failure straight away instead of blocking until their timeout, and any
+    later run_cli call fails immediately without starting a command.
+    """
+    global _stopping
+    _stopping = True
+    for proc in list(_running_procs):
+        try:
+            proc.terminate()
+        except OSError:
+            pass
 
 
 def validate_node_id(node_id: str) -> bool:
@@ -57,8 +166,8 @@ def validate_node_id(node_id: str) -> bool:
     # Remove leading ! if present for validation
     clean_id = node_id.lstrip('!')
     
-    # Should be alphanumeric characters (covers both hex and decimal formats)
-    return bool(re.match(r"^[0-9a-zA-Z]+$", clean_id))
+    # Should be ASCII alphanumeric characters (covers both hex and decimal formats)
+    return clean_id.isascii() and clean_id.isalnum()
 
 
 def validate_serial_device(serial_dev: str) -> bool:
@@ -74,8 +183,13 @@ def validate_serial_device(serial_dev: str) -> bool:
     if not serial_dev:
         return False
     
-    # Accept common serial device patterns
-    return bool(re.match(r"^/dev/tty[A-Z]+[0-9]+$", serial_dev))
+    # Accept common serial device patterns: /dev/tty<LETTERS><DIGITS>
+    if not serial_dev.startswith("/dev/tty"):
+        return False
+    name = serial_dev[8:]
+    letters = name.rstrip(string.digits)
+    return (0 < len(letters) < len(name)
+            and not letters.strip(string.ascii_uppercase))
 
 
 def build_meshtastic_command(base_args: List[str], serial_dev: Optional[str] = None) -> List[str]:
@@ -1,10 +1,20 @@
 #!/usr/bin/env python3
 """
-CSV utilities for handling telemetry and traceroute data.
+CSV utilities for handling telemetry and traceroute data, plus the atomic
+file and JSON writers shared by the loggers.
 """
+import json
+import os
 import time
 from pathlib import Path
-from typing import List, Any
+from typing import Iterable, List, Any
+
+# Serialize JSON snapshots with orjson when it is installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 
 def iso_now() -> str:
@@ -26,12 +36,16 @@ def ensure_header(csv_path: Path, header: List[str]) -> None:
             f.write(",".join(header) + "\n")
         return
     
-    with csv_path.open("r+", encoding="utf-8") as f:
-        content = f.read()
-        header_line = ",".join(header)
-        if not content.startswith(header_line):
+    header_line = ",".join(header).encode("utf-8")
+    with csv_path.open("rb+") as f:
+        # Only the leading slice is needed to check the header; the rest of
+        # the (possibly large) log is read only when a header must be prepended,
+        # and is copied as raw bytes without a decode/encode round-trip
+        if f.read(len(header_line)) != header_line:
+            f.seek(0, 0)
+            content = f.read()
             f.seek(0, 0)
-            f.write(header_line + "\n" + content)
+            f.write(header_line + b"\n" + content)
 
 
 def append_row(csv_path: Path, row: List[Any]) -> None:
@@ -42,8 +56,96 @@ def append_row(csv_path: Path, row: List[Any]) -> None:
         csv_path: Path to CSV file
         row: List of values to append
     """
-    with csv_path.open("a", encoding="utf-8") as f:
-        f.write(",".join(map(str, row)) + "\n")
+    _append_bytes(csv_path, (",".join(map(str, row)) + "\n").encode("utf-8"))
+
+
+def append_rows(csv_path: Path, rows: Iterable[List[Any]]) -> None:
+    """
+    Append several rows to the CSV file at csv_path with a single open and write.
+    
+    The rows are formatted and encoded up front, then written as one bytes
+    buffer, bypassing the text I/O layer.
+    
+    Args:
+        csv_path: Path to CSV file
+        rows: Iterable of row value lists to append
+    """
+    data = "".join(",".join(map(str, row)) + "\n" for row in rows).encode("utf-8")
+    if not data:
+        return
+    _append_bytes(csv_path, data)
+
+
+def _append_bytes(csv_path: Path, data: bytes) -> None:
+    """
+    Append raw bytes to csv_path using an O_APPEND descriptor.
+    
+    Going through os.open/os.write skips the buffered file object's setup
+    (fstat, isatty probe, seek to end), so an append costs open, write and
+    close only.
+    """
+    fd = os.open(csv_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """
+    Replace the file at path with data via a temp file renamed into place.
+    
+    Readers, and a stop mid-write, never see a truncated file. The temp file
+    is written through a raw descriptor like _append_bytes.
+    
+    Args:
+        path: Destination file path
+        data: Complete new file contents
+    """
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+
+def dump_json(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize obj to UTF-8 JSON bytes, with orjson when it is installed.
+    
+    Args:
+        obj: JSON-compatible object
+        indent: Indent by two spaces instead of writing compactly
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(obj, indent=2).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def load_json(raw: bytes) -> Any:
+    """Parse JSON bytes, with orjson when it is installed."""
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+
+# Telemetry CSV columns after timestamp and node, in header order
+TELEMETRY_FIELDS = (
+    # Basic device metrics
+    "battery_pct", "voltage_v", "channel_util_pct", "air_tx_pct", "uptime_s",
+    # Environment sensors
+    "temperature_c", "humidity_pct", "pressure_hpa", "iaq", "lux",
+    # Power monitoring
+    "current_ma",
+    "ch1_voltage_v", "ch1_current_ma", "ch2_voltage_v", "ch2_current_ma",
+    "ch3_voltage_v", "ch3_current_ma", "ch4_voltage_v", "ch4_current_ma",
+)
 
 
 def setup_telemetry_csv(csv_path: Path) -> None:
@@ -53,17 +155,7 @@ def setup_telemetry_csv(csv_path: Path) -> None:
     Args:
         csv_path: Path to telemetry CSV file
     """
-    header = [
-        "timestamp", "node", "battery_pct", "voltage_v", 
-        "channel_util_pct", "air_tx_pct", "uptime_s",
-        # Environment sensors
-        "temperature_c", "humidity_pct", "pressure_hpa", "iaq", "lux",
-        # Power monitoring
-        "current_ma", 
-        "ch1_voltage_v", "ch1_current_ma", "ch2_voltage_v", "ch2_current_ma",
-        "ch3_voltage_v", "ch3_current_ma", "ch4_voltage_v", "ch4_current_ma"
-    ]
-    ensure_header(csv_path, header)
+    ensure_header(csv_path, ["timestamp", "node", *TELEMETRY_FIELDS])
 
 
 def setup_traceroute_csv(csv_path: Path) -> None:
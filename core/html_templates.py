@@ -5,15 +5,13 @@ This module provides standardized styling and templates to ensure all HTML files
 have the same look and feel while containing all available information.
 """
 
+import math
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
-def get_standard_css() -> str:
-    """
-    Returns standardized CSS that will be used across all HTML pages
-    for consistent styling and modern responsive design.
-    """
-    return """
+# Standardized CSS used across all HTML pages for consistent styling and
+# modern responsive design. Built once at import time and shared by every page.
+STANDARD_CSS = """
         * { 
             box-sizing: border-box; 
         }
@@ -432,6 +430,13 @@ def get_standard_css() -> str:
         }
     """
 
+def get_standard_css() -> str:
+    """
+    Returns standardized CSS that will be used across all HTML pages
+    for consistent styling and modern responsive design.
+    """
+    return STANDARD_CSS
+
 def get_html_template(
     title: str, 
     content: str, 
@@ -489,7 +494,7 @@ def get_html_template(
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{title}</title>
     <style>
-        {get_standard_css()}
+        {STANDARD_CSS}
         {additional_css}
     </style>
 </head>
@@ -542,6 +547,12 @@ def format_value(value: Any, value_type: str = "text", empty_text: str = "N/A")
     except (ValueError, TypeError):
         return str(value) if str(value) != "" else f'<span class="empty-value">{empty_text}</span>'
 
+# Battery bar color class for each whole percentage 0-100
+_BATTERY_CLASSES = tuple(
+    "battery-high" if v > 75 else "battery-medium" if v > 25 else "battery-low"
+    for v in range(101)
+)
+
 def create_battery_bar(battery_pct: Optional[float]) -> str:
     """
     Create a visual battery level indicator.
@@ -557,12 +568,12 @@ def create_battery_bar(battery_pct: Optional[float]) -> str:
     
     try:
         pct = float(battery_pct)
-        if pct > 75:
-            color_class = "battery-high"
-        elif pct > 25:
-            color_class = "battery-medium"
+        # ceil() keeps the strict > thresholds exact for fractional values;
+        # out-of-range (and NaN) values fall into the end buckets as before
+        if 0 < pct < 100:
+            color_class = _BATTERY_CLASSES[math.ceil(pct)]
         else:
-            color_class = "battery-low"
+            color_class = _BATTERY_CLASSES[100 if pct >= 100 else 0]
         
         return f"""
         <div class="battery-bar">
@@ -4,7 +4,9 @@ Telemetry collection functionality for Meshtastic nodes.
 """
 import re
 import sys
-from typing import Dict, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any
 from .cli_utils import run_cli, build_meshtastic_command, validate_node_id
 from .node_discovery import collect_nodes_detailed
 
@@ -28,8 +30,39 @@ RE_CURRENT = re.compile(r"Current:\s*([0-9.]+)\s*(?:mA|A)")
 RE_CH_VOLT = re.compile(r"Channel\s*(\d+)\s*voltage:\s*([0-9.]+)\s*V")
 RE_CH_CURR = re.compile(r"Channel\s*(\d+)\s*current:\s*([0-9.]+)\s*(?:mA|A)")
 
+# All of the above joined into one alternation so the CLI output is scanned
+# once; the outer named group that matched identifies the metric
+RE_TELEMETRY = re.compile("|".join(f"(?P<{name}>{rx.pattern})" for name, rx in (
+    ("battery_pct", RE_BATT),
+    ("voltage_v", RE_VOLT),
+    ("channel_util_pct", RE_CHAN),
+    ("air_tx_pct", RE_AIR),
+    ("uptime_s", RE_UP),
+    ("temperature_c", RE_TEMP),
+    ("humidity_pct", RE_HUMIDITY),
+    ("pressure_hpa", RE_PRESSURE),
+    ("iaq", RE_IAQ),
+    ("lux", RE_LUX),
+    ("current_ma", RE_CURRENT),
+    ("ch_voltage", RE_CH_VOLT),
+    ("ch_current", RE_CH_CURR),
+)))
 
-def collect_telemetry_cli(dest: str, serial_dev: Optional[str] = None, timeout: int = 30) -> Optional[Dict[str, float]]:
+# Per-channel metrics: group name -> suffix of the chN_* telemetry key
+_CHANNEL_SUFFIXES = {"ch_voltage": "voltage_v", "ch_current": "current_ma"}
+
+
+def _parse_battery(value: str) -> float:
+    """Parse a battery percentage, clamped to a reasonable range."""
+    return min(max(float(value), 0.0), 100.0)
+
+
+# Value parsers for metrics that need more than float()
+_VALUE_PARSERS = {"battery_pct": _parse_battery}
+
+
+def collect_telemetry_cli(dest: str, serial_dev: Optional[str] = None, timeout: int = 30,
+                          nodes_data: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, float]]:
     """
     Collect telemetry data from a Meshtastic node using the CLI.
     
@@ -37,6 +70,8 @@ def collect_telemetry_cli(dest: str, serial_dev: Optional[str] = None, timeout:
         dest: Node ID to collect telemetry from (should start with !)
         serial_dev: Optional serial device path
         timeout: Command timeout in seconds
+        nodes_data: Optional node table from collect_nodes_detailed(); fetched
+            with a separate --nodes call when not given
         
     Returns:
         Dictionary of telemetry data or None if failed
@@ -47,7 +82,8 @@ def collect_telemetry_cli(dest: str, serial_dev: Optional[str] = None, timeout:
         return None
     
     # Try to get telemetry from the --nodes command first (more reliable)
-    nodes_data = collect_nodes_detailed(serial_dev, timeout)
+    if nodes_data is None:
+        nodes_data = collect_nodes_detailed(serial_dev, timeout)
     
     # Look for our target node in the nodes data
     target_node = None
@@ -114,6 +150,11 @@ def _collect_direct_telemetry(dest: str, serial_dev: Optional[str] = None, timeo
             # Parse this telemetry type
             parsed_data = _parse_telemetry_output(output)
             telemetry.update(parsed_data)
+        elif tel_type is None and output == "[TIMEOUT]":
+            # The node did not answer the default request; the sensor requests
+            # and the basic retry would each wait out the same timeout
+            print(f"[WARN] Failed to get telemetry for {dest}: {output}", file=sys.stderr)
+            return None
     
     # If no specific sensors worked, try the basic request
     if not telemetry:
@@ -140,74 +181,22 @@ def _parse_telemetry_output(output: str) -> Dict[str, float]:
     """
     telemetry = {}
     
-    # Device metrics (basic)
-    batt_match = RE_BATT.search(output)
-    if batt_match:
-        battery_val = float(batt_match.group(1))
-        # Clamp battery percentage to reasonable range
-        if battery_val > 100:
-            battery_val = 100.0
-        elif battery_val < 0:
-            battery_val = 0.0
-        telemetry["battery_pct"] = battery_val
-    
-    volt_match = RE_VOLT.search(output)
-    if volt_match:
-        telemetry["voltage_v"] = float(volt_match.group(1))
-    
-    chan_match = RE_CHAN.search(output)
-    if chan_match:
-        telemetry["channel_util_pct"] = float(chan_match.group(1))
-    
-    air_match = RE_AIR.search(output)
-    if air_match:
-        telemetry["air_tx_pct"] = float(air_match.group(1))
-    
-    up_match = RE_UP.search(output)
-    if up_match:
-        telemetry["uptime_s"] = float(up_match.group(1))
-    
-    # Environment metrics
-    temp_match = RE_TEMP.search(output)
-    if temp_match:
-        telemetry["temperature_c"] = float(temp_match.group(1))
-    
-    humidity_match = RE_HUMIDITY.search(output)
-    if humidity_match:
-        telemetry["humidity_pct"] = float(humidity_match.group(1))
-    
-    pressure_match = RE_PRESSURE.search(output)
-    if pressure_match:
-        telemetry["pressure_hpa"] = float(pressure_match.group(1))
-    
-    iaq_match = RE_IAQ.search(output)
-    if iaq_match:
-        telemetry["iaq"] = float(iaq_match.group(1))
-    
-    lux_match = RE_LUX.search(output)
-    if lux_match:
-        telemetry["lux"] = float(lux_match.group(1))
-    
-    # Power metrics
-    current_match = RE_CURRENT.search(output)
-    if current_match:
-        telemetry["current_ma"] = float(current_match.group(1))
-    
-    # Multi-channel voltage/current (for power monitoring devices)
-    for ch_volt_match in RE_CH_VOLT.finditer(output):
-        channel = int(ch_volt_match.group(1))
-        voltage = float(ch_volt_match.group(2))
-        telemetry[f"ch{channel}_voltage_v"] = voltage
-    
-    for ch_curr_match in RE_CH_CURR.finditer(output):
-        channel = int(ch_curr_match.group(1))
-        current = float(ch_curr_match.group(2))
-        telemetry[f"ch{channel}_current_ma"] = current
+    for match in RE_TELEMETRY.finditer(output):
+        name, idx = match.lastgroup, match.lastindex
+        if name in _CHANNEL_SUFFIXES:
+            # Multi-channel voltage/current (for power monitoring devices)
+            channel = int(match.group(idx + 1))
+            telemetry[f"ch{channel}_{_CHANNEL_SUFFIXES[name]}"] = float(match.group(idx + 2))
+        elif name not in telemetry:
+            # First reading of each metric wins
+            telemetry[name] = _VALUE_PARSERS.get(name, float)(match.group(idx + 1))
     
     return telemetry
 
 
-def collect_telemetry_batch(node_ids: list, serial_dev: Optional[str] = None, timeout: int = 30) -> Dict[str, Dict[str, float]]:
+def collect_telemetry_batch(node_ids: list, serial_dev: Optional[str] = None, timeout: int = 30, max_workers: int = 1,
+                            nodes_data: Optional[List[Dict[str, Any]]] = None,
+                            stop_event: Optional[threading.Event] = None) -> Dict[str, Dict[str, float]]:
     """
     Collect telemetry data from multiple nodes.
     
@@ -215,19 +204,37 @@ def collect_telemetry_batch(node_ids: list, serial_dev: Optional[str] = None, ti
         node_ids: List of node IDs to collect telemetry from
         serial_dev: Optional serial device path
         timeout: Command timeout in seconds
+        max_workers: Number of nodes to query concurrently; each query spends
+            nearly all of its time waiting on a meshtastic subprocess
+        nodes_data: Optional node table from collect_nodes_detailed(); when not
+            given it is fetched once and shared by all nodes in the batch
+        stop_event: Optional event; once set, nodes not yet started are skipped
         
     Returns:
         Dictionary mapping node IDs to their telemetry data
     """
-    results = {}
+    if node_ids and nodes_data is None:
+        nodes_data = collect_nodes_detailed(serial_dev, timeout)
     
-    for node_id in node_ids:
+    def collect(node_id):
+        if stop_event is not None and stop_event.is_set():
+            return node_id, None
         print(f"[INFO] Collecting telemetry for {node_id}")
-        telemetry = collect_telemetry_cli(node_id, serial_dev, timeout)
+        return node_id, collect_telemetry_cli(node_id, serial_dev, timeout, nodes_data=nodes_data)
+    
+    results = {}
+    
+    if max_workers > 1 and len(node_ids) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(node_ids))) as executor:
+            collected = list(executor.map(collect, node_ids))
+    else:
+        collected = map(collect, node_ids)
+    
+    for node_id, telemetry in collected:
         if telemetry:
             results[node_id] = telemetry
             print(f"[INFO] Telemetry collected for {node_id}")
-        else:
+        elif stop_event is None or not stop_event.is_set():
             print(f"[WARN] No telemetry data for {node_id}")
     
-    return results
\ No newline at end of file
+    return results
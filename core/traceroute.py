@@ -4,14 +4,24 @@ Traceroute functionality for Meshtastic networks.
 """
 import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional
 from .cli_utils import run_cli, build_meshtastic_command, validate_node_id
 
 
-# Regex patterns for parsing traceroute output
-RE_HOP = re.compile(r"^\s*\d+\s+(\S+)\s+(\S+)\s+([\d.]+)\s+ms")
-RE_FWD_HDR = re.compile(r"^traceroute to ")
-RE_BWD_HDR = re.compile(r"^traceroute from ")
+# Regex pattern for parsing traceroute output: section headers and hop lines are
+# named alternatives of one multiline pattern, so the whole output is parsed in a
+# single finditer sweep. Whitespace inside a line is matched with [^\S\n] so no
+# match can run across line boundaries.
+RE_TRACEROUTE_LINE = re.compile(
+    r"^[^\S\n]*(?:"
+    r"(?P<forward>traceroute to )"
+    r"|(?P<back>traceroute from )"
+    r"|\d+[^\S\n]+(?P<from_node>\S+)[^\S\n]+(?P<to_node>\S+)[^\S\n]+(?P<latency>[\d.]+)[^\S\n]+ms"
+    r")",
+    re.MULTILINE,
+)
 
 
 def collect_traceroute_cli(dest: str, serial_dev: Optional[str] = None, timeout: int = 30, retries: int = 3) -> Optional[Dict[str, List[Tuple[str, str, float]]]]:
@@ -62,42 +72,22 @@ def _parse_traceroute_output(output: str) -> Dict[str, List[Tuple[str, str, floa
     Returns:
         Dictionary with parsed forward and backward traceroute data
     """
-    lines = output.splitlines()
-    
-    forward_hops = []
-    backward_hops = []
-    current_section = None
-    
-    for line in lines:
-        line = line.strip()
-        
-        # Check for section headers
-        if RE_FWD_HDR.match(line):
-            current_section = "forward"
-            continue
-        elif RE_BWD_HDR.match(line):
-            current_section = "back"
-            continue
-        
-        # Parse hop lines
-        hop_match = RE_HOP.match(line)
-        if hop_match and current_section:
-            from_node = hop_match.group(1)
-            to_node = hop_match.group(2)
-            latency = float(hop_match.group(3))
-            
-            if current_section == "forward":
-                forward_hops.append((from_node, to_node, latency))
-            elif current_section == "back":
-                backward_hops.append((from_node, to_node, latency))
-    
-    return {
-        "forward": forward_hops,
-        "back": backward_hops
-    }
+    hops = {"forward": [], "back": []}
+    current_hops = None
+    
+    for match in RE_TRACEROUTE_LINE.finditer(output):
+        section = match.lastgroup
+        if section != "latency":
+            # Section header
+            current_hops = hops[section]
+        elif current_hops is not None:
+            current_hops.append((match["from_node"], match["to_node"], float(match["latency"])))
+    
+    return hops
 
 
-def collect_traceroute_batch(node_ids: List[str], serial_dev: Optional[str] = None, timeout: int = 30) -> Dict[str, Dict[str, List[Tuple[str, str, float]]]]:
+def collect_traceroute_batch(node_ids: List[str], serial_dev: Optional[str] = None, timeout: int = 30, max_workers: int = 1,
+                             stop_event: Optional[threading.Event] = None) -> Dict[str, Dict[str, List[Tuple[str, str, float]]]]:
     """
     Collect traceroute data from multiple nodes.
     
@@ -105,19 +95,32 @@ def collect_traceroute_batch(node_ids: List[str], serial_dev: Optional[str] = No
         node_ids: List of destination node IDs
         serial_dev: Optional serial device path
         timeout: Command timeout in seconds
+        max_workers: Number of traceroutes to run concurrently; each one spends
+            nearly all of its time waiting on a meshtastic subprocess
+        stop_event: Optional event; once set, nodes not yet started are skipped
         
     Returns:
         Dictionary mapping node IDs to their traceroute data
     """
+    def collect(node_id):
+        if stop_event is not None and stop_event.is_set():
+            return node_id, None
+        print(f"[INFO] Running traceroute to {node_id}")
+        return node_id, collect_traceroute_cli(node_id, serial_dev, timeout)
+    
     results = {}
     
-    for node_id in node_ids:
-        print(f"[INFO] Running traceroute to {node_id}")
-        traceroute_data = collect_traceroute_cli(node_id, serial_dev, timeout)
+    if max_workers > 1 and len(node_ids) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(node_ids))) as executor:
+            collected = list(executor.map(collect, node_ids))
+    else:
+        collected = map(collect, node_ids)
+    
+    for node_id, traceroute_data in collected:
         if traceroute_data:
             results[node_id] = traceroute_data
             print(f"[INFO] Traceroute completed for {node_id}")
-        else:
+        elif stop_event is None or not stop_event.is_set():
             print(f"[WARN] Traceroute failed for {node_id}")
     
     return results
@@ -7,28 +7,34 @@ Refactored Meshtastic telemetry & traceroute logger.
 - Modular design for easier maintenance
 """
 import argparse
-import json
 import signal
-import subprocess
 import sys
-import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 
 from core import (
     discover_all_nodes, collect_nodes_detailed, normalize_node_id,
     collect_telemetry_batch, collect_traceroute_batch,
-    setup_telemetry_csv, setup_traceroute_csv,
-    iso_now, append_row
+    setup_telemetry_csv, setup_traceroute_csv, TELEMETRY_FIELDS,
+    iso_now, append_rows, write_atomic, dump_json, load_json, terminate_running_commands
 )
 
+# Traceroute result keys and the direction label written to the CSV
+TRACE_DIRECTIONS = (("forward", "forward"), ("back", "backward"))
+
 
 class MeshtasticLogger:
     """Main Meshtastic telemetry and traceroute logger class."""
     
     def __init__(self, args):
         self.args = args
-        self.stop_requested = False
+        self.stop_event = threading.Event()
+        
+        # Background plotting, created on first use
+        self._plot_executor: Optional[ThreadPoolExecutor] = None
+        self._plot_future: Optional[Future] = None
         
         # Setup file paths
         self.tele_csv = Path(args.output)
@@ -54,7 +60,9 @@ class MeshtasticLogger:
     def _signal_handler(self, signum, frame):
         """Handle interrupt signals gracefully."""
         print(f"\n[INFO] Received signal {signum}, stopping gracefully...", file=sys.stderr)
-        self.stop_requested = True
+        self.stop_event.set()
+        # Don't wait out the timeout of a meshtastic call that is in flight
+        terminate_running_commands()
     
     def _setup_output_files(self):
         """Setup output directories and CSV files with proper headers."""
@@ -70,8 +78,9 @@ class MeshtasticLogger:
         """Load existing node tracking data from JSON file."""
         if self.nodes_json_path.exists():
             try:
-                with open(self.nodes_json_path, 'r') as f:
-                    data = json.load(f)
+                with open(self.nodes_json_path, 'rb') as f:
+                    raw = f.read()
+                    data = load_json(raw)
                     self.all_nodes = data.get('all_nodes', {})
                     self.node_seen_counts = data.get('node_seen_counts', {})
                     self.node_first_seen = data.get('node_first_seen', {})
@@ -82,37 +91,41 @@ class MeshtasticLogger:
                 print(f"[WARN] Could not load node tracking data: {e}", file=sys.stderr)
     
     def _save_node_tracking_data(self):
-        """Save node tracking data to JSON file."""
+        """Save node tracking data to JSON file.
+        
+        The snapshot is written compactly to a temporary file and renamed over
+        the old one, so a crash mid-write never leaves a truncated file behind.
+        """
+        payload = {
+            'all_nodes': self.all_nodes,
+            'node_seen_counts': self.node_seen_counts,
+            'node_first_seen': self.node_first_seen,
+            'node_last_seen': self.node_last_seen,
+            'total_tries': self.total_tries
+        }
         try:
-            with open(self.nodes_json_path, 'w') as f:
-                json.dump({
-                    'all_nodes': self.all_nodes,
-                    'node_seen_counts': self.node_seen_counts,
-                    'node_first_seen': self.node_first_seen,
-                    'node_last_seen': self.node_last_seen,
-                    'total_tries': self.total_tries
-                }, f, indent=2)
+            write_atomic(self.nodes_json_path, dump_json(payload))
         except Exception as e:
             print(f"[WARN] Could not save node data: {e}", file=sys.stderr)
     
-    def _update_node_tracking(self, nodes: List[dict]):
-        """Update node tracking information."""
-        current_ts = iso_now()
-        
+    def _update_node_tracking(self, nodes: List[dict], current_ts: str):
+        """Update node tracking information, stamping nodes with the cycle timestamp."""
+        seen_counts = self.node_seen_counts
+        first_seen = self.node_first_seen
+        last_seen = self.node_last_seen
+        all_nodes = self.all_nodes
         for node in nodes:
             node_id = node.get("id")
             if not node_id:
                 continue
             
             # Update counters and timestamps
-            self.node_seen_counts[node_id] = self.node_seen_counts.get(node_id, 0) + 1
-            
-            if node_id not in self.node_first_seen:
-                self.node_first_seen[node_id] = current_ts
-            self.node_last_seen[node_id] = current_ts
+            seen_counts[node_id] = seen_counts.get(node_id, 0) + 1
+            first_seen.setdefault(node_id, current_ts)
+            last_seen[node_id] = current_ts
             
             # Store node data
-            self.all_nodes[node_id] = node
+            all_nodes[node_id] = node
     
     def _get_target_nodes(self) -> List[str]:
         """Get the list of nodes to collect data from."""
@@ -123,47 +136,39 @@ class MeshtasticLogger:
         else:
             return [normalize_node_id(node) for node in self.args.nodes]
     
-    def _collect_and_log_telemetry(self, target_nodes: List[str], cycle_ts: str):
+    def _collect_and_log_telemetry(self, target_nodes: List[str], cycle_ts: str, nodes_data: List[dict]):
         """Collect and log telemetry data for target nodes."""
         print(f"[INFO] Collecting telemetry from {len(target_nodes)} nodes...")
         
         telemetry_data = collect_telemetry_batch(
-            target_nodes, 
-            self.args.serial, 
-            timeout=30
+            target_nodes,
+            self.args.serial,
+            timeout=30,
+            max_workers=self.args.concurrency,
+            nodes_data=nodes_data,
+            stop_event=self.stop_event
         )
         
-        # Log telemetry to CSV
+        # Log telemetry to CSV, written in one append once all nodes are collected
+        rows = []
+        empty_nodes = []
+        all_nodes = self.all_nodes
         for node_id, tele in telemetry_data.items():
-            append_row(self.tele_csv, [
-                cycle_ts, node_id,
-                # Basic device metrics
-                tele.get("battery_pct", ""),
-                tele.get("voltage_v", ""),
-                tele.get("channel_util_pct", ""),
-                tele.get("air_tx_pct", ""),
-                tele.get("uptime_s", ""),
-                # Environment sensors
-                tele.get("temperature_c", ""),
-                tele.get("humidity_pct", ""),
-                tele.get("pressure_hpa", ""),
-                tele.get("iaq", ""),
-                tele.get("lux", ""),
-                # Power monitoring
-                tele.get("current_ma", ""),
-                tele.get("ch1_voltage_v", ""),
-                tele.get("ch1_current_ma", ""),
-                tele.get("ch2_voltage_v", ""),
-                tele.get("ch2_current_ma", ""),
-                tele.get("ch3_voltage_v", ""),
-                tele.get("ch3_current_ma", ""),
-                tele.get("ch4_voltage_v", ""),
-                tele.get("ch4_current_ma", "")
-            ])
+            get = tele.get
+            values = [get(field, "") for field in TELEMETRY_FIELDS]
+            if not self.args.log_empty_rows and all(v is None or v == "" for v in values):
+                # Nothing usable came back (e.g. battery "N/A" only); don't log a blank row
+                empty_nodes.append(node_id)
+                continue
+            rows.append([cycle_ts, node_id] + values)
             
             # Update node data
-            if node_id in self.all_nodes:
-                self.all_nodes[node_id].update(tele)
+            node = all_nodes.get(node_id)
+            if node is not None:
+                node.update(tele)
+        append_rows(self.tele_csv, rows)
+        if empty_nodes:
+            print(f"[INFO] Skipped empty telemetry rows for {len(empty_nodes)} nodes: {', '.join(empty_nodes)}")
         
         return telemetry_data
     
@@ -177,48 +182,65 @@ class MeshtasticLogger:
         traceroute_data = collect_traceroute_batch(
             target_nodes,
             self.args.serial,
-            timeout=30
+            timeout=30,
+            max_workers=self.args.concurrency,
+            stop_event=self.stop_event
         )
         
-        # Log traceroute to CSV
-        for node_id, routes in traceroute_data.items():
-            # Log forward hops
-            for i, (src, dst, db) in enumerate(routes.get("forward", [])):
-                append_row(self.trace_csv, [cycle_ts, node_id, "forward", i, src, dst, db])
-            
-            # Log backward hops  
-            for i, (src, dst, db) in enumerate(routes.get("back", [])):
-                append_row(self.trace_csv, [cycle_ts, node_id, "backward", i, src, dst, db])
+        # Log traceroute to CSV, streaming forward then backward hops into one append
+        rows = (
+            [cycle_ts, node_id, direction, i, src, dst, db]
+            for node_id, routes in traceroute_data.items()
+            for key, direction in TRACE_DIRECTIONS
+            for i, (src, dst, db) in enumerate(routes.get(key, ()))
+        )
+        append_rows(self.trace_csv, rows)
         
         return traceroute_data
     
     def _run_plotting(self):
-        """Run the plotting script to generate visualizations."""
-        if not self.args.plot:
+        """Start the plotting script to generate visualizations.
+        
+        The plotter is imported and run in-process, so pandas and matplotlib
+        are loaded once rather than in a fresh interpreter every cycle. It runs
+        on a background worker so the next cycle's collection is not held up;
+        if the previous run is still busy this cycle's plot is skipped.
+        """
+        if not self.args.plot or self.stop_event.is_set():
             return
         
-        try:
-            plot_cmd = [
-                "python3", "plot_meshtastic.py",
-                "--telemetry", str(self.tele_csv),
-                "--traceroute", str(self.trace_csv),
-                "--outdir", str(self.plot_outdir)
-            ]
-            
-            if self.args.regenerate_charts:
-                plot_cmd.append("--regenerate-charts")
-                
-            if self.args.preserve_history:
-                plot_cmd.append("--preserve-history")
+        if self._plot_future is not None and not self._plot_future.done():
+            print("[INFO] Previous plotting run still in progress, skipping this cycle")
+            return
+        
+        plot_argv = [
+            "--telemetry", str(self.tele_csv),
+            "--traceroute", str(self.trace_csv),
+            "--outdir", str(self.plot_outdir)
+        ]
+        
+        if self.args.regenerate_charts:
+            plot_argv.append("--regenerate-charts")
             
-            print("[INFO] Running plotting script...")
-            subprocess.run(plot_cmd, check=True)
+        if self.args.preserve_history:
+            plot_argv.append("--preserve-history")
+        
+        if self._plot_executor is None:
+            self._plot_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plot")
+        print("[INFO] Running plotting script...")
+        self._plot_future = self._plot_executor.submit(self._plot, plot_argv)
+    
+    def _plot(self, plot_argv: List[str]):
+        """Run the plotter with the given arguments, reporting any failure."""
+        try:
+            import plot_meshtastic
+            plot_meshtastic.main(plot_argv)
             print("[INFO] Plotting completed successfully")
             
-        except subprocess.CalledProcessError as e:
-            print(f"[ERROR] Plotting failed: {e}", file=sys.stderr)
+        except ImportError as e:
+            print(f"[ERROR] Plotting unavailable: {e}", file=sys.stderr)
         except Exception as e:
-            print(f"[ERROR] Unexpected plotting error: {e}", file=sys.stderr)
+            print(f"[ERROR] Plotting failed: {e}", file=sys.stderr)
     
     def run_cycle(self):
         """Run a single data collection cycle."""
@@ -229,7 +251,7 @@ class MeshtasticLogger:
         
         # Discover all nodes for tracking
         all_discovered_nodes = collect_nodes_detailed(self.args.serial)
-        self._update_node_tracking(all_discovered_nodes)
+        self._update_node_tracking(all_discovered_nodes, cycle_ts)
         
         # Get target nodes for data collection
         target_nodes = self._get_target_nodes()
@@ -239,11 +261,19 @@ class MeshtasticLogger:
         
         print(f"[INFO] Target nodes: {target_nodes}")
         
-        # Collect telemetry data
-        telemetry_data = self._collect_and_log_telemetry(target_nodes, cycle_ts)
-        
-        # Collect traceroute data
-        traceroute_data = self._collect_and_log_traceroute(target_nodes, cycle_ts)
+        # Collect telemetry and traceroute data; with --parallel-trace the
+        # traceroutes run on a second thread while telemetry is collected
+        # (they only write to the traceroute CSV)
+        if self.args.parallel_trace and not self.args.no_trace:
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace") as trace_executor:
+                trace_future = trace_executor.submit(self._collect_and_log_traceroute, target_nodes, cycle_ts)
+                # Reuse this cycle's node table rather than re-running --nodes per node
+                telemetry_data = self._collect_and_log_telemetry(target_nodes, cycle_ts, all_discovered_nodes)
+                traceroute_data = trace_future.result()
+        else:
+            # Reuse this cycle's node table rather than re-running --nodes per node
+            telemetry_data = self._collect_and_log_telemetry(target_nodes, cycle_ts, all_discovered_nodes)
+            traceroute_data = self._collect_and_log_traceroute(target_nodes, cycle_ts)
         
         # Save node tracking data
         self._save_node_tracking_data()
@@ -260,19 +290,16 @@ class MeshtasticLogger:
         print(f"[INFO] Output: telemetry={self.tele_csv}, traceroute={self.trace_csv}")
         print(f"[INFO] Plots: {self.plot_outdir}")
         
-        while not self.stop_requested:
+        while not self.stop_event.is_set():
             try:
                 self.run_cycle()
                 
-                if self.args.once:
+                if self.args.once or self.stop_event.is_set():
                     break
                 
-                # Sleep until next cycle
+                # Sleep until next cycle; a stop signal wakes the wait early
                 print(f"[INFO] Sleeping for {self.args.interval} seconds...")
-                for _ in range(int(self.args.interval * 10)):
-                    if self.stop_requested:
-                        break
-                    time.sleep(0.1)
+                self.stop_event.wait(timeout=self.args.interval)
                     
             except KeyboardInterrupt:
                 print("\n[INFO] Interrupted by user", file=sys.stderr)
@@ -283,6 +310,9 @@ class MeshtasticLogger:
                     break
                 # Continue running in interval mode
                 
+        if self._plot_executor is not None:
+            # Let a plot that is already running finish writing its files
+            self._plot_executor.shutdown(wait=True)
         print("[INFO] Meshtastic logger stopped")
 
 
@@ -297,6 +327,10 @@ def parse_args():
     
     # Connection options
     parser.add_argument("--serial", help="Serial device path (e.g., /dev/ttyACM0)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Number of nodes to query concurrently (keep at 1 if the radio cannot serve parallel CLI sessions)")
+    parser.add_argument("--parallel-trace", action="store_true",
+                        help="Run the traceroute phase alongside telemetry collection (needs a connection that allows concurrent CLI sessions, e.g. TCP to meshtasticd)")
     
     # Output options
     parser.add_argument("--output", default="telemetry.csv", help="Telemetry CSV output file")
@@ -309,6 +343,7 @@ def parse_args():
     
     # Feature toggles
     parser.add_argument("--no-trace", action="store_true", help="Disable traceroute collection")
+    parser.add_argument("--log-empty-rows", action="store_true", help="Log telemetry rows even when every metric is empty")
     parser.add_argument("--plot", action="store_true", help="Generate plots after data collection")
     parser.add_argument("--regenerate-charts", action="store_true", help="Force regeneration of all charts")
     parser.add_argument("--preserve-history", action="store_true", help="Create timestamped directories and preserve history")
@@ -8,52 +8,52 @@ Meshtastic telemetry & traceroute logger
 - Interruptible with SIGINT/SIGTERM
 """
 import argparse
+import html
+import importlib.util
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict
 import signal
 import sys
-import time
+import threading
 import subprocess
 import re
-import json
 import pandas as pd
 
-# ---- Telemetry CLI parsing ----
-RE_BATT = re.compile(r"Battery level:\s*([0-9.]+)%")
-RE_VOLT = re.compile(r"Voltage:\s*([0-9.]+)\s*V")
-RE_CHAN = re.compile(r"Total channel utilization:\s*([0-9.]+)%")
-RE_AIR  = re.compile(r"Transmit air utilization:\s*([0-9.]+)%")
-RE_UP   = re.compile(r"Uptime:\s*([0-9]+)\s*s")
-
 # Import from core modules to avoid duplication
-from core import run_cli, iso_now, ensure_header, append_row, discover_all_nodes
+from core import (
+    run_cli, iter_cli_lines, iso_now, ensure_header, append_rows, write_atomic, dump_json,
+    load_json, discover_all_nodes, collect_nodes_detailed, collect_telemetry_cli, validate_serial_device
+)
 
 # --- Regex patterns for parsing ---
 
-# Match traceroute hop lines: " 1  router1  10.0.0.1  0.123 ms"
-RE_HOP = re.compile(r"^\s*\d+\s+(\S+)\s+(\S+)\s+([\d.]+)\s+ms")
-# Match forward traceroute section header: "traceroute to ..."
-RE_FWD_HDR = re.compile(r"^traceroute to ")
-# Match backward traceroute section header: "traceroute from ..."
-RE_BWD_HDR = re.compile(r"^traceroute from ")
+# Use google-re2's linear-time matcher for output parsing when it is installed;
+# the patterns below stick to syntax both engines accept
+try:
+    import re2 as _fastre
+except ImportError:
+    _fastre = re
 
-# --- Meshtastic telemetry and traceroute functions ---
+# Traceroute hops: the "!a --> !b (x.xxdB)" format, or the old hop-table
+# format " 1  router1  10.0.0.1  0.123 ms" as fallback
+ROUTE_PATTERN = _fastre.compile(
+    r'(?m)!(?P<src>[0-9a-zA-Z]+)[^\S\n]+-->[^\S\n]+!(?P<dst>[0-9a-zA-Z]+)[^\S\n]+\((?P<db>\d+\.\d+)dB\)'
+    r'|^[^\S\n]*\d+[^\S\n]+(?P<hop_src>\S+)[^\S\n]+(?P<hop_dst>\S+)[^\S\n]+(?P<ms>[\d.]+)[^\S\n]+ms'
+)
 
-def collect_telemetry_cli(dest: str, serial_dev: Optional[str]=None, timeout: int=30) -> Optional[Dict[str, float]]:
-    """Collect telemetry data from a Meshtastic node using the CLI."""
-    # Import the proper telemetry collection function from core module
-    from core.telemetry import collect_telemetry_cli as core_collect_telemetry
-    
-    # Use the proper implementation from core module
-    return core_collect_telemetry(dest, serial_dev, timeout)
+# --- Meshtastic telemetry and traceroute functions ---
 
 def collect_traceroute_cli(dest: str, serial_dev: Optional[str] = None, timeout: int = 30, retries: int = 3) -> Optional[Dict[str, List[Tuple[str, str, float]]]]:
     """Collect traceroute data from a Meshtastic node using the CLI with retries."""
-    if not re.match(r"^![0-9a-zA-Z]+$", dest):
+    if not (dest.startswith("!") and dest[1:].isascii() and dest[1:].isalnum()):
         print(f"[ERROR] Invalid node ID: {dest}", file=sys.stderr)
         return None
-    if serial_dev and not re.match(r"^/dev/tty[A-Z]+[0-9]+$", serial_dev):
+    if serial_dev and not validate_serial_device(serial_dev):
         print(f"[ERROR] Invalid serial device: {serial_dev}", file=sys.stderr)
         return None
 
@@ -64,41 +64,25 @@ def collect_traceroute_cli(dest: str, serial_dev: Optional[str] = None, timeout:
     for attempt in range(1, retries + 1):
         ok, out = run_cli(cmd, timeout=timeout)
         if ok:
-            # Parse traceroute output
-            lines = out.splitlines()
+            # Parse traceroute output in one pass over the whole text: hops of
+            # either format are found by a single pattern and assigned to the
+            # back route when they start after its header
             fwd: List[Tuple[str, str, float]] = []
             bwd: List[Tuple[str, str, float]] = []
-            section = None  # "fwd" | "bwd" | None
+            split_idx = out.find("Route traced back to us:")
+            if split_idx < 0:
+                split_idx = len(out)
 
-            # New regex pattern for the actual output format
-            route_pattern = re.compile(r'!([0-9a-zA-Z]+)\s+-->\s+!([0-9a-zA-Z]+)\s+\((\d+\.\d+)dB\)')
-            
-            for line in lines:
-                if "Route traced towards destination:" in line:
-                    section = "fwd"
-                    continue
-                if "Route traced back to us:" in line:
-                    section = "bwd"
-                    continue
-                    
-                # Try the new format first
-                m = route_pattern.search(line)
-                if m:
-                    a, b, val = f"!{m.group(1)}", f"!{m.group(2)}", float(m.group(3))
-                    if section == "bwd":
-                        bwd.append((a, b, val))
+            # Every hop line contains "-->" or "ms"; output with neither (no
+            # response, errors) skips the regex scan entirely
+            if "-->" in out or "ms" in out:
+                for m in ROUTE_PATTERN.finditer(out):
+                    src, dst, db, hop_src, hop_dst, ms = m.groups()
+                    if src is not None:
+                        hop = (f"!{src}", f"!{dst}", float(db))
                     else:
-                        fwd.append((a, b, val))
-                    continue
-                
-                # Try the old format as fallback
-                m = RE_HOP.search(line)
-                if m:
-                    a, b, val = m.group(1), m.group(2), float(m.group(3))
-                    if section == "bwd":
-                        bwd.append((a, b, val))
-                    else:
-                        fwd.append((a, b, val))
+                        hop = (hop_src, hop_dst, float(ms))
+                    (bwd if m.start() >= split_idx else fwd).append(hop)
 
             if fwd or bwd:
                 return {"forward": fwd, "back": bwd}
@@ -113,16 +97,37 @@ def collect_traceroute_cli(dest: str, serial_dev: Optional[str] = None, timeout:
 # Add a function to run the --nodes command and parse its output
 def collect_nodes(timeout: int = 30) -> Optional[List[dict]]:
     """Collect detailed node information using the core module."""
-    from core.node_discovery import collect_nodes_detailed
     return collect_nodes_detailed(timeout=timeout)
 
+@lru_cache(maxsize=1024)
+def _location_link(lat, lon) -> str:
+    """OpenStreetMap link for a node position, or "N/A"; nodes rarely move, so results are cached."""
+    if lat and lon:
+        return f"<a href='https://www.openstreetmap.org/?mlat={lat}&mlon={lon}' target='_blank'>{lat}, {lon}</a>"
+    return "N/A"
+
+def _write_html(path: Path, text: str, head: bytes = b"") -> None:
+    """Write a generated page atomically as one UTF-8 bytes write.
+
+    head is an already encoded static start of the page.
+    """
+    write_atomic(path, head + text.encode("utf-8"))
+
+# Cleared by --no-debug; _debug then returns before formatting anything
+_debug_enabled = True
+
+def _debug(msg: str, *args) -> None:
+    """Print a [DEBUG] line, %-formatting args only when debug output is enabled."""
+    if _debug_enabled:
+        print("[DEBUG] " + (msg % args if args else msg))
+
 # Function to update index.html with node information only (no traceroutes)
 def update_index_html_with_nodes_only(nodes: List[dict], output_dir: Path):
     index_path = output_dir / "index.html"
     rows = []
     for node in sorted(nodes, key=lambda x: x.get("last_seen", ""), reverse=True):
         lat, lon = node.get("latitude"), node.get("longitude")
-        location_link = f"<a href='https://www.openstreetmap.org/?mlat={lat}&mlon={lon}' target='_blank'>{lat}, {lon}</a>" if lat and lon else "N/A"
+        location_link = _location_link(lat, lon)
         rows.append(f"""
         <tr>
             <td>{node['user']}</td>
@@ -152,8 +157,20 @@ def update_index_html_with_nodes_only(nodes: List[dict], output_dir: Path):
     </table>
     """.format(rows="\n".join(rows))
 
-    with index_path.open("w", encoding="utf-8") as f:
-        f.write(f"<html><body>{table}</body></html>")
+    _write_html(index_path, f"<html><body>{table}</body></html>")
+
+# Static script and button appended after the update_index_html table
+_HOPS_FILTER_HTML = """<script>
+        function filterHops() {
+            const rows = document.querySelectorAll('tbody tr');
+            rows.forEach(row => {
+                const hops = row.cells[5].innerText;
+                row.style.display = hops === 'N/A' ? 'none' : '';
+            });
+        }
+    </script>
+    <button onclick="filterHops()">Show Only Nodes with Hops</button>
+    """
 
 # Function to update index.html with node and traceroute information
 def update_index_html(nodes: List[dict], output_dir: Path, traceroutes: Dict[str, Dict[str, List[Tuple[str, str, float]]]]):
@@ -161,7 +178,7 @@ def update_index_html(nodes: List[dict], output_dir: Path, traceroutes: Dict[str
     rows = []
     for node in sorted(nodes, key=lambda x: x.get("last_seen", ""), reverse=True):
         lat, lon = node.get("latitude"), node.get("longitude")
-        location_link = f"<a href='https://www.openstreetmap.org/?mlat={lat}&mlon={lon}' target='_blank'>{lat}, {lon}</a>" if lat and lon else "N/A"
+        location_link = _location_link(lat, lon)
         traceroute_data = traceroutes.get(node['id'], {})
 
         # Format traceroute data
@@ -204,20 +221,508 @@ def update_index_html(nodes: List[dict], output_dir: Path, traceroutes: Dict[str
             {rows}
         </tbody>
     </table>
-    <script>
-        function filterHops() {{
-            const rows = document.querySelectorAll('tbody tr');
-            rows.forEach(row => {{
-                const hops = row.cells[5].innerText;
-                row.style.display = hops === 'N/A' ? 'none' : '';
-            }});
+    """.format(rows="\n".join(rows)) + _HOPS_FILTER_HTML
+
+    _write_html(index_path, f"<html><body>{table}</body></html>")
+
+# Static shell of diagnostics.html, built once at import and filled in with
+# str.format each cycle. The traceroute styles live in the page head once
+# instead of being repeated inside every node's table row.
+_DIAGNOSTICS_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Meshtastic Network Diagnostics</title>
+    <style>
+        body {{
+            font-family: Arial, sans-serif;
+            line-height: 1.6;
+            margin: 0;
+            padding: 20px;
+            color: #333;
         }}
-    </script>
-    <button onclick="filterHops()">Show Only Nodes with Hops</button>
-    """.format(rows="\n".join(rows))
+        .container {{
+            max-width: 1200px;
+            margin: 0 auto;
+        }}
+        h1 {{
+            color: #2c7a2c;
+            border-bottom: 2px solid #4CAF50;
+            padding-bottom: 10px;
+        }}
+        .nav-links {{
+            margin: 20px 0;
+        }}
+        .nav-links a {{
+            display: inline-block;
+            margin-right: 15px;
+            color: #0066cc;
+            text-decoration: none;
+        }}
+        .nav-links a:hover {{
+            text-decoration: underline;
+        }}
+        table {{border-collapse: collapse; width: 100%; margin-top: 20px;}}
+        th, td {{text-align: left; padding: 8px; border: 1px solid #ddd;}}
+        tr:nth-child(even) {{background-color: #f2f2f2;}}
+        th {{background-color: #4CAF50; color: white;}}
+        .telemetry-pills {{display: flex; flex-wrap: wrap; gap: 5px;}}
+        .pill {{
+            background-color: #f1f1f1;
+            padding: 4px 8px;
+            border-radius: 16px;
+            font-size: 12px;
+            display: inline-block;
+            margin-bottom: 3px;
+        }}
+        .traceroute {{
+            margin: 10px 0;
+        }}
+        .trace-section {{
+            margin-bottom: 15px;
+        }}
+        .trace-path {{
+            border: 1px solid #ddd;
+            padding: 10px;
+            border-radius: 4px;
+        }}
+        .hop {{
+            display: flex;
+            align-items: center;
+            margin-bottom: 5px;
+            padding: 5px;
+            background-color: #f9f9f9;
+        }}
+        .hop-num {{
+            background-color: #4CAF50;
+            color: white;
+            border-radius: 50%;
+            width: 24px;
+            height: 24px;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            margin-right: 10px;
+        }}
+        .hop-arrow {{
+            margin: 0 8px;
+            color: #666;
+        }}
+        .hop-db {{
+            margin-left: auto;
+            font-weight: bold;
+            background-color: #f0f0f0;
+            padding: 2px 6px;
+            border-radius: 3px;
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="nav-links">
+            <a href="index.html">Home</a>
+            <a href="dashboards.html">Node Dashboards</a>
+            <a href="nodes.html">All Nodes</a>
+        </div>
+        
+        <h1>Meshtastic Network Diagnostics</h1>
+        <p>Last updated: {updated} - Total cycles: {total_tries}</p>
+        <table>
+            <thead>
+                <tr>
+                    <th>User</th>
+                    <th>ID</th>
+                    <th>AKA</th>
+                    <th>Location</th>
+                    <th>Seen Timestamps</th>
+                    <th>Hops</th>
+                    <th>Connectivity</th>
+                    <th>Telemetry</th>
+                    <th>Traceroute</th>
+                </tr>
+            </thead>
+            <tbody>
+                {rows}
+            </tbody>
+        </table>
+        
+        <div class="nav-links" style="margin-top: 30px;">
+            <a href="index.html">Back to Home</a>
+        </div>
+    </div>
+</body>
+</html>"""
+
+# Stylesheet for dashboards.html; the node cards all share these classes
+_DASHBOARDS_CSS = """<style>
+body {font-family: Arial, sans-serif; margin: 20px;}
+.dashboard-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
+    gap: 20px;
+    margin-top: 20px;
+}
+.node-card {
+    border: 1px solid #ddd;
+    border-radius: 8px;
+    padding: 15px;
+    box-shadow: 0 2px 6px rgba(0,0,0,0.1);
+    transition: transform 0.2s, box-shadow 0.2s;
+}
+.node-card:hover {
+    transform: translateY(-5px);
+    box-shadow: 0 5px 15px rgba(0,0,0,0.15);
+}
+.node-id {
+    font-family: monospace;
+    background-color: #f5f5f5;
+    padding: 3px 6px;
+    border-radius: 3px;
+    font-size: 14px;
+    margin-left: 8px;
+}
+.node-metrics {
+    display: grid;
+    grid-template-columns: repeat(2, 1fr);
+    gap: 10px;
+    margin-top: 15px;
+}
+.metric {
+    background-color: #f9f9f9;
+    padding: 8px;
+    border-radius: 4px;
+    text-align: center;
+}
+.metric-name {
+    font-size: 12px;
+    color: #666;
+}
+.metric-value {
+    font-size: 16px;
+    font-weight: bold;
+    margin-top: 5px;
+}
+.view-btn {
+    display: inline-block;
+    background-color: #4CAF50;
+    color: white;
+    padding: 8px 16px;
+    border-radius: 4px;
+    margin-top: 15px;
+    text-decoration: none;
+    text-align: center;
+}
+.view-btn:hover {
+    background-color: #45a049;
+}
+h1 {margin-bottom: 10px;}
+</style>"""
+
+# Static leading part of the summary pages, encoded once; _write_html
+# writes it ahead of the per-cycle part of each page
+_DASHBOARDS_HEAD = ("""<!doctype html>
+<meta charset='utf-8'>
+<title>Node Dashboards</title>
+""" + _DASHBOARDS_CSS + """
+<h1>Node Dashboards</h1>
+""").encode("utf-8")
+_NODES_HEAD = """<!doctype html><meta charset='utf-8'><title>All Discovered Nodes</title>
+<style>
+body {font-family: Arial, sans-serif; margin: 20px;}
+table {border-collapse: collapse; width: 100%;}
+th, td {text-align: left; padding: 8px; border: 1px solid #ddd;}
+tr:nth-child(even) {background-color: #f2f2f2;}
+th {background-color: #4CAF50; color: white;}
+</style>
+""".encode("utf-8")
+_INDEX_HEAD = """<!doctype html>
+<meta charset='utf-8'>
+<meta name='viewport' content='width=device-width,initial-scale=1'>
+<title>Meshtastic Telemetry & Traceroute</title>
+<style>
+    body {font-family: Arial, sans-serif; margin: 20px;}
+    .card-container {display: flex; flex-wrap: wrap; gap: 20px; margin-top: 20px;}
+    .card {
+        border: 1px solid #ddd; border-radius: 8px; padding: 20px;
+        width: 300px; box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+    }
+    h1, h2 {color: #333;}
+    a {text-decoration: none; color: #0066cc;}
+    a:hover {text-decoration: underline;}
+    .stats {background-color: #f5f5f5; padding: 10px; border-radius: 5px; margin-top: 20px;}
+</style>
+<h1>Meshtastic Telemetry & Traceroute</h1>
+""".encode("utf-8")
+
+def _node_labels(node: dict) -> Dict[str, str]:
+    """HTML-escaped user, aka and id of a node, for embedding in generated pages."""
+    return {
+        "user": html.escape(str(node.get("user", "Unknown"))),
+        "aka": html.escape(str(node.get("aka", ""))),
+        "id": html.escape(str(node.get("id", ""))),
+    }
+
+# Per-row fragments of diagnostics.html, kept on one line each so repeated
+# rows carry no template indentation
+_DIAG_ROW_HTML = (
+    "<tr><td>{user}</td><td>{node_id}</td><td>{aka}</td><td>{location}</td>"
+    "<td><div>First: {first_seen}</div><div>Last: {last_seen}</div></td>"
+    "<td>{hops}</td><td>{seen_stats}</td><td>{telemetry}</td><td>{traceroute}</td></tr>\n"
+)
+_TELEMETRY_PILLS_HTML = (
+    '<div class="telemetry-pills"><span class="pill">🔋 {battery}%</span>'
+    '<span class="pill">⚡ {voltage}V</span><span class="pill">📡 {channel_util}%</span>'
+    '<span class="pill">📻 {air_tx}%</span><span class="pill">⏱️ {uptime_hours} hrs</span></div>'
+)
+_TRACEROUTE_HTML = (
+    "<div class='traceroute'><div class='trace-section'><h4>Forward Path</h4>{forward}</div>"
+    "<div class='trace-section'><h4>Backward Path</h4>{backward}</div></div>"
+)
+_HOP_HTML = (
+    "<div class='hop'><div class='hop-num'>{}</div><div class='hop-from'>{}</div>"
+    "<div class='hop-arrow'>→</div><div class='hop-to'>{}</div><div class='hop-db'>{} dB</div></div>"
+)
+
+# Per-node card of dashboards.html
+_DASHBOARD_CARD_HTML = """
+    <div class="node-card">
+        <h3>{user} <span class="node-id">{node_id}</span></h3>
+        {aka}
+        <div class="node-metrics">
+            <div class="metric">
+                <div class="metric-name">Battery</div>
+                <div class="metric-value">{battery}%</div>
+            </div>
+            <div class="metric">
+                <div class="metric-name">Voltage</div>
+                <div class="metric-value">{voltage} V</div>
+            </div>
+        </div>
+        <a href="node_{clean_id}/index.html" class="view-btn">View Details</a>
+    </div>"""
+
+# Row fragment of the nodes.html table
+_NODES_ROW_HTML = (
+    "<tr><td>{user}</td><td>{node_id}</td><td>{aka}</td><td>{last_seen}</td>"
+    "<td>{latitude}, {longitude}</td><td>{hops}</td></tr>"
+)
+
+def _trace_path_html(hops: List[Tuple[str, str, float]], empty_html: str) -> str:
+    """Render one traceroute direction as a list of hop boxes for diagnostics.html."""
+    if not hops:
+        return empty_html
+    hop_html = _HOP_HTML.format
+    parts = ["<div class='trace-path'>"]
+    parts.extend(hop_html(i, a, b, val) for i, (a, b, val) in enumerate(hops, 1))
+    parts.append("</div>")
+    return "".join(parts)
+
+def _collect_node_data(cli_node_id: str, serial_dev: Optional[str], no_trace: bool,
+                       trace_executor: Optional[ThreadPoolExecutor] = None) -> Tuple[Optional[dict], Optional[dict]]:
+    """Collect telemetry and (unless disabled) traceroute data for one node.
+
+    With a trace_executor the traceroute runs on it while telemetry is collected.
+    Returns a (telemetry, traceroute) tuple; either may be None.
+    """
+    # Start the traceroute now if it may overlap with telemetry
+    trace_future = None
+    if trace_executor is not None:
+        print(f"[INFO] Running traceroute for specified node: {cli_node_id}")
+        trace_future = trace_executor.submit(collect_traceroute_cli, dest=cli_node_id, serial_dev=serial_dev)
+
+    # Collect telemetry
+    print(f"[INFO] Collecting telemetry for specified node: {cli_node_id}")
+    tele = collect_telemetry_cli(cli_node_id, serial_dev=serial_dev)
+
+    # Collect traceroute if not disabled
+    tr = None
+    if trace_future is not None:
+        tr = trace_future.result()
+    elif not no_trace:
+        print(f"[INFO] Running traceroute for specified node: {cli_node_id}")
+        tr = collect_traceroute_cli(dest=cli_node_id, serial_dev=serial_dev)
+    return tele, tr
+
+# Basic telemetry metrics shown on node pages, in telemetry CSV column order
+_BASIC_METRICS = ("battery_pct", "voltage_v", "channel_util_pct", "air_tx_pct", "uptime_s")
+
+# Latest-metrics map from _load_latest_telemetry, reused across polling cycles
+# until the telemetry CSV changes on disk (path, mtime and size). "offset" is
+# how far the log has been parsed so appended rows can be read on their own.
+_telemetry_cache = {"key": None, "header": None, "offset": 0, "latest_by_node": {}}
+
+def _load_latest_telemetry(tele_csv: Path) -> Dict[str, Dict[str, float]]:
+    """Return the latest non-empty value of each basic metric per node in the telemetry CSV.
+
+    Nodes are keyed by ID without the ! prefix. The CSV is parsed with pandas
+    only when it changed since the last call, and when it only grew, just the
+    appended rows are parsed and merged in. An unreadable or missing file
+    yields an empty mapping. The returned mapping is shared, do not mutate it.
+    """
+    metrics = list(_BASIC_METRICS)
+    try:
+        st = tele_csv.stat()
+    except OSError:
+        return {}
+    key = (str(tele_csv), st.st_mtime_ns, st.st_size)
+    cache = _telemetry_cache
+    if cache["key"] == key:
+        return cache["latest_by_node"]
+    try:
+        with tele_csv.open("rb") as f:
+            header = f.readline()
+            # Same log with the same header that only grew: seek past the rows
+            # already parsed instead of re-reading the whole file
+            appended = (
+                cache["key"] is not None and cache["key"][0] == key[0]
+                and cache["header"] == header and header.endswith(b"\n")
+                and len(header) <= cache["offset"] <= st.st_size
+            )
+            start = cache["offset"] if appended else len(header)
+            f.seek(start)
+            data = f.read()
+        # Leave a partially written last row for the next call
+        data = data[:data.rfind(b"\n") + 1]
+        df = pd.read_csv(io.BytesIO(header + data), usecols=["node"] + metrics, dtype={"node": str})
+    except Exception as e:
+        print(f"[WARN] Error loading historical telemetry from {tele_csv}: {e}", file=sys.stderr)
+        return {}
+    df[metrics] = df[metrics].apply(pd.to_numeric, errors="coerce")
+    df["node"] = df["node"].str.lstrip("!")
+    # GroupBy.last() skips NaN per column, giving the most recent value of each metric
+    latest = df.groupby("node", sort=False)[metrics].last()
+    latest_by_node = dict(cache["latest_by_node"]) if appended else {}
+    for node, values in latest.to_dict("index").items():
+        values = {metric: value for metric, value in values.items() if pd.notna(value)}
+        latest_by_node[node] = {**latest_by_node.get(node, {}), **values}
+    cache.update(key=key, header=header, offset=start + len(data), latest_by_node=latest_by_node)
+    return latest_by_node
+
+def _table_pct(cell: str) -> float:
+    """Parse a percentage cell of the meshtastic --nodes table, 0.0 when it is not a number."""
+    value = cell.rstrip('%')
+    return float(value) if value.replace('.', '', 1).isdigit() else 0.0
+
+def _parse_nodes_table(lines) -> Tuple[List[str], Dict[str, dict]]:
+    """Parse meshtastic --nodes table rows into node IDs and per-node info, as lines arrive."""
+    node_ids = []
+    node_rows = {}
+    for line in lines:
+        if "!" in line and "│" in line:
+            parts = [part.strip() for part in line.split("│")]
+            if len(parts) >= 3:  # Node ID is typically in the 3rd column
+                node_id = parts[2]
+                if node_id.startswith("!") and len(node_id) > 1:
+                    node_ids.append(node_id)
+
+                    # Extract all node information from the line
+                    if len(parts) >= 15:  # Ensure we have enough parts to parse
+                        (user, nid, aka, hardware, key, firmware, latitude, longitude,
+                         altitude, signal_strength, channel_util, air_tx, hops, last_seen) = parts[1:15]
+                        node_info = {
+                            'user': user,
+                            'id': nid,
+                            'aka': aka,
+                            'hardware': hardware,
+                            'key': key,
+                            'firmware': firmware,
+                            'latitude': latitude,
+                            'longitude': longitude,
+                            'altitude': altitude,
+                            'signal_strength': signal_strength,
+                            'channel_util_pct': _table_pct(channel_util),
+                            'air_tx_pct': _table_pct(air_tx),
+                            'hops': hops,
+                            'last_seen': last_seen
+                        }
+                        node_rows[node_id] = node_info
+    return node_ids, node_rows
+
+# Topology snapshot names per plot directory, rescanned only when the
+# directory's mtime changes (a snapshot was added, replaced or removed)
+_topology_cache = {}
+
+def _topology_images(plot_outdir: Path) -> List[str]:
+    """Return the sorted topology_*.png names in plot_outdir using a single directory scan."""
+    mtime_ns = plot_outdir.stat().st_mtime_ns
+    cached = _topology_cache.get(plot_outdir)
+    if cached is None or cached[0] != mtime_ns:
+        with os.scandir(plot_outdir) as it:
+            names = sorted(e.name for e in it if e.name.startswith("topology_") and e.name.endswith(".png"))
+        cached = _topology_cache[plot_outdir] = (mtime_ns, names)
+    return cached[1]
+
+# Helper scripts (update_dashboard.py, update_node_pages.py, ...) are loaded
+# once and reused on later cycles instead of being re-read and re-executed
+_script_modules = {}
+
+def _load_script_module(name: str, path: Path):
+    """Load the script at path as module name on first use; None if it has no loader."""
+    module = _script_modules.get(name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(name, path)
+        if not (spec and spec.loader):
+            return None
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _script_modules[name] = module
+    return module
+
+def _load_optional_script(name: str, path: Path):
+    """Load the helper script at path, or return None if it is missing or fails to import."""
+    if not path.exists():
+        print(f"[WARN] {path.name} not found at {path}", file=sys.stderr)
+        return None
+    try:
+        return _load_script_module(name, path)
+    except Exception as e:
+        print(f"[WARN] Could not load {path.name} module: {e}", file=sys.stderr)
+        return None
+
+def _run_dashboard_update(dashboard_updater: Path) -> None:
+    """Run update_dashboard.update_dashboard() in-process, loading the module on first use."""
+    _load_script_module("update_dashboard", dashboard_updater).update_dashboard()
+
+def _page_mtime(page_path) -> Optional[int]:
+    """Return the modification time of a generated node page, or None if missing."""
+    try:
+        return os.stat(page_path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
 
-    with index_path.open("w", encoding="utf-8") as f:
-        f.write(f"<html><body>{table}</body></html>")
+# Data each node page was last rendered from, with the page's mtime right
+# after that render: {node_id: (signature, mtime_ns)}
+_page_signatures = {}
+
+def _page_signature(update_node_pages_module, telemetry_data, traceroute_data) -> str:
+    """Fingerprint what a node page shows, including its time-dependent status badge."""
+    telemetry_data = telemetry_data or {}
+    status_indicator = getattr(update_node_pages_module, "create_status_indicator", None)
+    status = status_indicator(telemetry_data.get("last_seen")) if status_indicator else None
+    return repr((sorted(telemetry_data.items()), traceroute_data, status))
+
+def _render_node_page(update_node_pages_module, node_id: str, telemetry_data, traceroute_data,
+                      plot_outdir: Path) -> Optional[int]:
+    """Render a node page with update_node_pages unless it already shows this data.
+
+    The page is skipped only when its last render, by any pass, used the same
+    data and the file has not been rewritten since (e.g. by plotting). Returns
+    the page mtime.
+    """
+    signature = _page_signature(update_node_pages_module, telemetry_data, traceroute_data)
+    page_path = plot_outdir / f"node_{node_id.strip('!')}" / "index.html"
+    cached = _page_signatures.get(node_id)
+    if cached is not None and cached[0] == signature:
+        mtime_ns = _page_mtime(page_path)
+        if mtime_ns is not None and mtime_ns == cached[1]:
+            _debug("Node page for %s is up to date", node_id)
+            return mtime_ns
+    mtime_ns = _page_mtime(update_node_pages_module.update_node_pages(
+        node_id, telemetry_data, traceroute_data, plot_outdir
+    ))
+    _page_signatures[node_id] = (signature, mtime_ns)
+    return mtime_ns
 
 # ---- Main ----
 
@@ -234,19 +739,25 @@ def parse_args():
     p.add_argument("--serial", help="Serial device path, e.g. /dev/ttyACM0 or /dev/ttyUSB0")
     p.add_argument("--once", action="store_true", help="Collect exactly one cycle and exit")
     p.add_argument("--no-trace", action="store_true", help="Disable traceroute collection")
+    p.add_argument("--concurrency", type=int, default=1,
+                   help="Number of nodes to query concurrently (keep at 1 if the radio cannot serve parallel CLI sessions)")
+    p.add_argument("--parallel-trace", action="store_true",
+                   help="Run each node's traceroute alongside its telemetry request (needs a connection that allows concurrent CLI sessions, e.g. TCP to meshtasticd)")
     p.add_argument("--no-plot", action="store_true", dest="no_plot", help="Disable automatic plotting after each cycle")
+    p.add_argument("--no-debug", action="store_true", help="Suppress [DEBUG] output")
     p.add_argument("--plot-outdir", default="plots", help="Output directory to write plots (used when auto-plotting)")
     p.add_argument("--regenerate-charts", action="store_true", help="Force regeneration of all charts when plotting")
     return p.parse_args()
 
-_stop = False
+_stop = threading.Event()
 def _sig_handler(signum, frame):
-    global _stop
-    _stop = True
+    _stop.set()
     print("\n[INFO] Stopping...", file=sys.stderr)
 
 def main():
+    global _debug_enabled
     args = parse_args()
+    _debug_enabled = not args.no_debug
     tele_csv = Path(args.output)
     trace_csv = Path(args.trace_output)
     plot_outdir = Path(args.plot_outdir)
@@ -288,8 +799,9 @@ def main():
     nodes_json_path = plot_outdir / "nodes.json"
     if nodes_json_path.exists():
         try:
-            with open(nodes_json_path, 'r') as f:
-                saved_data = json.load(f)
+            with open(nodes_json_path, 'rb') as f:
+                raw = f.read()
+                saved_data = load_json(raw)
                 all_nodes = saved_data.get('all_nodes', {})
                 node_seen_counts = saved_data.get('node_seen_counts', {})
                 node_first_seen = saved_data.get('node_first_seen', {})
@@ -299,21 +811,38 @@ def main():
         except Exception as e:
             print(f"[WARN] Could not load saved node data: {e}", file=sys.stderr)
 
+    # Workers for querying several nodes at once, and for running each node's
+    # traceroute while its telemetry is collected
+    concurrency = max(1, args.concurrency)
+    node_executor = ThreadPoolExecutor(max_workers=concurrency) if concurrency > 1 and len(args.nodes) > 1 else None
+    trace_executor = ThreadPoolExecutor(max_workers=concurrency) if args.parallel_trace and not args.no_trace else None
+
+    # The node page helper script is loaded once up front; if it is missing,
+    # the node page steps are skipped
+    script_dir = Path(__file__).parent
+    update_node_pages_module = _load_optional_script("update_node_pages", script_dir / "update_node_pages.py")
+
     # Collect all nodes initially
     nodes = collect_nodes() or []
     # We'll generate HTML files in a single batch at the end
     
     # Only run telemetry and traceroute for nodes specified in --nodes
+    # Normalize node IDs by ensuring they have the ! prefix for CLI commands;
+    # the node list is fixed for the whole run
+    cli_node_ids = [f"!{bare_id}" if (bare_id := node_id.strip('!')) else node_id for node_id in args.nodes]
+
     while True:
         cycle_ts = iso_now()
         total_tries += 1
+        page_mtimes = {}  # {node_id: mtime of the node page as we last wrote it}
+        historical_telemetry = None  # {normalized node id: latest logged metrics}, loaded on first use
         print(f"[INFO] Starting collection cycle {total_tries} at {cycle_ts}")
         
         # Run meshtastic --nodes before each cycle
         nodes = collect_nodes() or []
         
-        # Update the node tracking data
-        current_ts = iso_now()
+        # Update the node tracking data, stamped with the cycle timestamp
+        current_ts = cycle_ts
         for node in nodes:
             node_id = node.get("id")
             if node_id:
@@ -328,45 +857,48 @@ def main():
                 # Store the updated node data
                 all_nodes[node_id] = node
         
-        # Save node data to json
+        # Save node data to json, compactly and via a temp file renamed into
+        # place so a stop mid-write never leaves a truncated nodes.json
         try:
-            with open(nodes_json_path, 'w') as f:
-                json.dump({
-                    'all_nodes': all_nodes,
-                    'node_seen_counts': node_seen_counts,
-                    'node_first_seen': node_first_seen,
-                    'node_last_seen': node_last_seen,
-                    'total_tries': total_tries
-                }, f)
+            payload = {
+                'all_nodes': all_nodes,
+                'node_seen_counts': node_seen_counts,
+                'node_first_seen': node_first_seen,
+                'node_last_seen': node_last_seen,
+                'total_tries': total_tries
+            }
+            write_atomic(nodes_json_path, dump_json(payload))
         except Exception as e:
             print(f"[WARN] Could not save node data: {e}", file=sys.stderr)
         
         # Create a list of all nodes, including those seen in previous runs
         all_nodes_list = list(all_nodes.values())
         
-        # Sort all nodes by last seen timestamp (most recent first)
-        sorted_nodes = sorted(
-            all_nodes_list, 
-            key=lambda x: node_last_seen.get(x.get("id", ""), ""), 
-            reverse=True
-        )
+        # Sort all nodes by last seen timestamp (most recent first). The keys
+        # are looked up once into (last_seen, node) pairs and sorted with a
+        # C-level itemgetter rather than a Python lambda per node.
+        last_seen_get = node_last_seen.get
+        decorated = [(last_seen_get(node.get("id", ""), ""), node) for node in all_nodes_list]
+        decorated.sort(key=itemgetter(0), reverse=True)
+        sorted_nodes = [node for _, node in decorated]
 
         # Collect telemetry and traceroute data ONLY for nodes specified in --nodes
         telemetry_data = {}
         traceroutes = {}
-        for node_id in args.nodes:
-            # Normalize node ID by ensuring it has ! prefix for CLI commands
-            normalized_node_id = node_id.strip('!')
-            cli_node_id = f"!{normalized_node_id}" if normalized_node_id else node_id
-            
-            # Collect telemetry
-            print(f"[INFO] Collecting telemetry for specified node: {cli_node_id}")
-            tele = collect_telemetry_cli(cli_node_id, serial_dev=args.serial)
-            print(f"[DEBUG] Telemetry collection result for {cli_node_id}: {tele}")
+        # CSV rows are collected per cycle and written with one append per file
+        tele_rows = []
+        trace_rows = []
+        collect = partial(_collect_node_data, serial_dev=args.serial, no_trace=args.no_trace,
+                          trace_executor=trace_executor)
+        # Nodes are queried concurrently with --concurrency; results are
+        # consumed in --nodes order so rows and node updates stay on this thread
+        results = node_executor.map(collect, cli_node_ids) if node_executor is not None else map(collect, cli_node_ids)
+        for node_id, cli_node_id, (tele, tr) in zip(args.nodes, cli_node_ids, results):
+            _debug("Telemetry collection result for %s: %s", cli_node_id, tele)
             if tele:
                 telemetry_data[cli_node_id] = tele
                 # Log telemetry data to CSV
-                append_row(tele_csv, [
+                tele_rows.append([
                     cycle_ts, cli_node_id, 
                     tele.get("battery_pct", ""),
                     tele.get("voltage_v", ""),
@@ -377,30 +909,35 @@ def main():
                 print(f"[INFO] Telemetry logged for {cli_node_id}")
                 
                 # Update the node data in the all_nodes dictionary
-                print(f"[DEBUG] Updating node {node_id} with telemetry data in all_nodes")
+                _debug("Updating node %s with telemetry data in all_nodes", node_id)
                 if node_id in all_nodes:
                     for key, value in tele.items():
                         all_nodes[node_id][key] = value
-                    print(f"[DEBUG] Updated node data: {all_nodes[node_id]}")
+                    _debug("Updated node data: %s", all_nodes[node_id])
                 else:
-                    print(f"[DEBUG] Node {node_id} not found in all_nodes")
+                    _debug("Node %s not found in all_nodes", node_id)
             
-            # Collect traceroute if not disabled
-            if not args.no_trace:
-                print(f"[INFO] Running traceroute for specified node: {cli_node_id}")
-                tr = collect_traceroute_cli(dest=cli_node_id, serial_dev=args.serial)
-                if tr:
-                    traceroutes[cli_node_id] = tr
-                    # Log forward hops
-                    for i, (src, dst, db) in enumerate(tr.get("forward", [])):
-                        append_row(trace_csv, [cycle_ts, cli_node_id, "forward", i, src, dst, db])
-                    # Log backward hops
-                    for i, (src, dst, db) in enumerate(tr.get("back", [])):
-                        append_row(trace_csv, [cycle_ts, cli_node_id, "backward", i, src, dst, db])
-                    print(f"[INFO] Traceroute logged for {cli_node_id}")
+            # Log traceroute if one was collected
+            if tr:
+                traceroutes[cli_node_id] = tr
+                # Log forward hops
+                trace_rows.extend([cycle_ts, cli_node_id, "forward", i, src, dst, db]
+                                  for i, (src, dst, db) in enumerate(tr.get("forward", [])))
+                # Log backward hops
+                trace_rows.extend([cycle_ts, cli_node_id, "backward", i, src, dst, db]
+                                  for i, (src, dst, db) in enumerate(tr.get("back", [])))
+                print(f"[INFO] Traceroute logged for {cli_node_id}")
+
+        append_rows(tele_csv, tele_rows)
+        append_rows(trace_csv, trace_rows)
 
         # Prepare to generate all HTML files in one pass
         print("[INFO] Generating HTML dashboards and diagnostics...")
+        # One "Last updated" stamp shared by every page written this cycle
+        pages_ts = iso_now()
+        
+        # Escape each node's user-supplied names once; every page below reuses them
+        node_labels = {node["id"]: _node_labels(node) for node in sorted_nodes if node.get("id")}
         
         # Export diagnostics.html with improved traceroute presentation
         rows = []
@@ -422,7 +959,7 @@ def main():
             
             # Get location info
             lat, lon = node.get("latitude"), node.get("longitude")
-            location_link = f"<a href='https://www.openstreetmap.org/?mlat={lat}&mlon={lon}' target='_blank'>{lat}, {lon}</a>" if lat and lon else "N/A"
+            location_link = _location_link(lat, lon)
             
             # Add telemetry data if available
             telemetry_html = "N/A"
@@ -432,15 +969,10 @@ def main():
                 channel_util = node.get("channel_util_pct", "N/A")
                 air_tx = node.get("air_tx_pct", "N/A")
                 
-                telemetry_html = f"""
-                <div class="telemetry-pills">
-                    <span class="pill">🔋 {battery}%</span>
-                    <span class="pill">⚡ {voltage}V</span>
-                    <span class="pill">📡 {channel_util}%</span>
-                    <span class="pill">📻 {air_tx}%</span>
-                    <span class="pill">⏱️ {uptime_hours if uptime_hours != "N/A" else "N/A"} hrs</span>
-                </div>
-                """
+                telemetry_html = _TELEMETRY_PILLS_HTML.format(
+                    battery=battery, voltage=voltage, channel_util=channel_util,
+                    air_tx=air_tx, uptime_hours=uptime_hours
+                )
             
             # Traceroute presentation
             tr = traceroutes.get(node_id)
@@ -448,215 +980,24 @@ def main():
                 fwd = tr.get("forward", [])
                 bwd = tr.get("back", [])
                 # Create a better visualization for the traceroute data
-                fwd_html = ""
-                if fwd:
-                    fwd_html = "<div class='trace-path'>"
-                    for i, (a, b, val) in enumerate(fwd):
-                        fwd_html += f"""
-                        <div class='hop'>
-                            <div class='hop-num'>{i+1}</div>
-                            <div class='hop-from'>{a}</div>
-                            <div class='hop-arrow'>→</div>
-                            <div class='hop-to'>{b}</div>
-                            <div class='hop-db'>{val} dB</div>
-                        </div>
-                        """
-                    fwd_html += "</div>"
-                else:
-                    fwd_html = "<em>No forward hops</em>"
+                fwd_html = _trace_path_html(fwd, "<em>No forward hops</em>")
+                bwd_html = _trace_path_html(bwd, "<em>No backward hops</em>")
                     
-                bwd_html = ""
-                if bwd:
-                    bwd_html = "<div class='trace-path'>"
-                    for i, (a, b, val) in enumerate(bwd):
-                        bwd_html += f"""
-                        <div class='hop'>
-                            <div class='hop-num'>{i+1}</div>
-                            <div class='hop-from'>{a}</div>
-                            <div class='hop-arrow'>→</div>
-                            <div class='hop-to'>{b}</div>
-                            <div class='hop-db'>{val} dB</div>
-                        </div>
-                        """
-                    bwd_html += "</div>"
-                else:
-                    bwd_html = "<em>No backward hops</em>"
-                    
-                traceroute_html = f"""
-                <div class='traceroute'>
-                    <div class='trace-section'>
-                        <h4>Forward Path</h4>
-                        {fwd_html}
-                    </div>
-                    <div class='trace-section'>
-                        <h4>Backward Path</h4>
-                        {bwd_html}
-                    </div>
-                </div>
-                <style>
-                    .traceroute {{
-                        margin: 10px 0;
-                    }}
-                    .trace-section {{
-                        margin-bottom: 15px;
-                    }}
-                    .trace-path {{
-                        border: 1px solid #ddd;
-                        padding: 10px;
-                        border-radius: 4px;
-                    }}
-                    .hop {{
-                        display: flex;
-                        align-items: center;
-                        margin-bottom: 5px;
-                        padding: 5px;
-                        background-color: #f9f9f9;
-                    }}
-                    .hop-num {{
-                        background-color: #4CAF50;
-                        color: white;
-                        border-radius: 50%;
-                        width: 24px;
-                        height: 24px;
-                        display: flex;
-                        align-items: center;
-                        justify-content: center;
-                        margin-right: 10px;
-                    }}
-                    .hop-arrow {{
-                        margin: 0 8px;
-                        color: #666;
-                    }}
-                    .hop-db {{
-                        margin-left: auto;
-                        font-weight: bold;
-                        background-color: #f0f0f0;
-                        padding: 2px 6px;
-                        border-radius: 3px;
-                    }}
-                </style>
-                """
+                traceroute_html = _TRACEROUTE_HTML.format(forward=fwd_html, backward=bwd_html)
             else:
                 traceroute_html = "<em>No traceroute data</em>"
                 
-            rows.append(f"""
-            <tr>
-                <td>{node.get('user', 'Unknown')}</td>
-                <td>{node_id}</td>
-                <td>{node.get('aka', '')}</td>
-                <td>{location_link}</td>
-                <td>
-                    <div>First: {first_seen_date}</div>
-                    <div>Last: {last_seen_date}</div>
-                </td>
-                <td>{node.get('hops', 'N/A')}</td>
-                <td>{seen_stats}</td>
-                <td>{telemetry_html}</td>
-                <td>{traceroute_html}</td>
-            </tr>
-            """)
-        
-        # Add CSS for telemetry pills
-        table_css = """
-        <style>
-            table {border-collapse: collapse; width: 100%; margin-top: 20px;}
-            th, td {text-align: left; padding: 8px; border: 1px solid #ddd;}
-            tr:nth-child(even) {background-color: #f2f2f2;}
-            th {background-color: #4CAF50; color: white;}
-            .telemetry-pills {display: flex; flex-wrap: wrap; gap: 5px;}
-            .pill {
-                background-color: #f1f1f1;
-                padding: 4px 8px;
-                border-radius: 16px;
-                font-size: 12px;
-                display: inline-block;
-                margin-bottom: 3px;
-            }
-        </style>
-        """
-        
-        table = f"""
-        <h1>Meshtastic Network Diagnostics</h1>
-        <p>Last updated: {iso_now()} - Total cycles: {total_tries}</p>
-        {table_css}
-        <table>
-            <thead>
-                <tr>
-                    <th>User</th>
-                    <th>ID</th>
-                    <th>AKA</th>
-                    <th>Location</th>
-                    <th>Seen Timestamps</th>
-                    <th>Hops</th>
-                    <th>Connectivity</th>
-                    <th>Telemetry</th>
-                    <th>Traceroute</th>
-                </tr>
-            </thead>
-            <tbody>
-                {''.join(rows)}
-            </tbody>
-        </table>
-        """
-        
-        # Create a complete HTML page with better formatting
-        html_page = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Meshtastic Network Diagnostics</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            line-height: 1.6;
-            margin: 0;
-            padding: 20px;
-            color: #333;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-        }}
-        h1 {{
-            color: #2c7a2c;
-            border-bottom: 2px solid #4CAF50;
-            padding-bottom: 10px;
-        }}
-        .nav-links {{
-            margin: 20px 0;
-        }}
-        .nav-links a {{
-            display: inline-block;
-            margin-right: 15px;
-            color: #0066cc;
-            text-decoration: none;
-        }}
-        .nav-links a:hover {{
-            text-decoration: underline;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="nav-links">
-            <a href="index.html">Home</a>
-            <a href="dashboards.html">Node Dashboards</a>
-            <a href="nodes.html">All Nodes</a>
-        </div>
-        
-        {table}
+            rows.append(_DIAG_ROW_HTML.format(
+                user=node_labels[node_id]["user"], node_id=node_labels[node_id]["id"], aka=node_labels[node_id]["aka"],
+                location=location_link, first_seen=first_seen_date, last_seen=last_seen_date,
+                hops=node.get('hops', 'N/A'), seen_stats=seen_stats,
+                telemetry=telemetry_html, traceroute=traceroute_html
+            ))
         
-        <div class="nav-links" style="margin-top: 30px;">
-            <a href="index.html">Back to Home</a>
-        </div>
-    </div>
-</body>
-</html>"""
+        html_page = _DIAGNOSTICS_PAGE.format(updated=pages_ts, total_tries=total_tries, rows="".join(rows))
         
         # 1. First write the diagnostics.html file
-        with diagnostics_path.open("w", encoding="utf-8") as f:
-            f.write(html_page)
+        _write_html(diagnostics_path, html_page)
         print("[INFO] Generated diagnostics.html with detailed node information")
         
         # 2. Now prepare the index.html with traceroute information
@@ -666,127 +1007,66 @@ def main():
         # Next, update individual node pages with both telemetry and traceroute data
         try:
             # Debug: Print the nodes data to see what we're working with
-            print(f"[DEBUG] Nodes data available: {len(sorted_nodes)} nodes")
+            _debug("Nodes data available: %s nodes", len(sorted_nodes))
             if sorted_nodes:
-                print(f"[DEBUG] Sample node data: {sorted_nodes[0]}")
+                _debug("Sample node data: %s", sorted_nodes[0])
             
-            # Import the update_node_pages module dynamically
-            update_node_pages_path = Path(__file__).parent / "update_node_pages.py"
-            if update_node_pages_path.exists():
-                spec = importlib.util.spec_from_file_location("update_node_pages", update_node_pages_path)
-                if spec and spec.loader:
-                    update_node_pages_module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(update_node_pages_module)
-                    
-                    # Count how many pages we update
-                    pages_updated = 0
-                    print("[DEBUG] Starting node page updates...")
-                    
-                    # For each node with telemetry data, create/update its page
-                    for node in sorted_nodes:
-                        node_id = node.get("id", "")
-                        if node_id:
-                            # Get latest telemetry for this node from the collected data
-                            telemetry_data = {}
-                            for metric in ["battery_pct", "voltage_v", "channel_util_pct", "air_tx_pct", "uptime_s"]:
-                                if metric in node:
-                                    telemetry_data[metric] = node[metric]
-                            
-                            print(f"[DEBUG] Node {node_id} metrics from node object: {[m for m in ['battery_pct', 'voltage_v', 'channel_util_pct', 'air_tx_pct', 'uptime_s'] if m in node]}")
-                            print(f"[DEBUG] Node {node_id} telemetry data extracted: {telemetry_data}")
-                            
-                            # If telemetry data is empty, try to load the latest from telemetry_log.csv
-                            if not telemetry_data and Path("telemetry_log.csv").exists():
-                                try:
-                                    # Normalize node ID by removing ! prefix
-                                    normalized_node_id = node_id.strip('!')
-                                    print(f"[DEBUG] Looking for historical data for node {normalized_node_id} in telemetry_log.csv")
-                                    
-                                    # Read the file and find entries for this node based on normalized ID
-                                    matching_lines = []
-                                    
-                                    # Use subprocess to safely grep the file
-                                    import subprocess
-                                    try:
-                                        # Use grep with -F for fixed strings to avoid regex interpretation
-                                        result = subprocess.run(
-                                            ["grep", normalized_node_id, "telemetry_log.csv"],
-                                            capture_output=True,
-                                            text=True,
-                                            check=False  # Don't raise exception if grep doesn't find matches
-                                        )
-                                        if result.stdout:
-                                            matching_lines = result.stdout.strip().split('\n')
-                                    except Exception as grep_err:
-                                        print(f"[WARN] Error using grep to find node data: {grep_err}", file=sys.stderr)
-                                        # Fall back to manual search if grep fails
-                                        with open("telemetry_log.csv", "r") as f:
-                                            for line in f:
-                                                if normalized_node_id in line:
-                                                    matching_lines.append(line.strip())
-                                    
-                                    # For each metric, find the most recent non-empty value
-                                    if matching_lines:
-                                        # Initialize metrics we want to find
-                                        metrics = ["battery_pct", "voltage_v", "channel_util_pct", "air_tx_pct", "uptime_s"]
-                                        
-                                        # Start from the most recent entries
-                                        for line in reversed(matching_lines):
-                                            parts = line.split(",")
-                                            if len(parts) >= 7:  # Make sure line has enough fields
-                                                # Check each metric position
-                                                for i, metric in enumerate(metrics):
-                                                    # Only process if we haven't found this metric yet
-                                                    if metric not in telemetry_data and parts[i+2].strip():
-                                                        try:
-                                                            telemetry_data[metric] = float(parts[i+2])
-                                                        except ValueError:
-                                                            pass  # Ignore invalid values
-                                        
-                                        print(f"[DEBUG] Loaded historical telemetry data for {normalized_node_id}: {telemetry_data}")
-                                except Exception as e:
-                                    print(f"[WARN] Error loading historical data for {normalized_node_id}: {e}", file=sys.stderr)
-                            
-                                # Get node data from all_nodes dictionary (if available)
-                            if node_id in all_nodes:
-                                node_info = all_nodes.get(node_id, {})
-                                # Add node info to telemetry data
-                                for key, value in node_info.items():
-                                    if key not in telemetry_data:  # Don't overwrite telemetry data with node info
-                                        telemetry_data[key] = value
-                                print(f"[DEBUG] Enhanced telemetry data with node info from all_nodes for {node_id}")
-                                
-                            # Get traceroute data for this node if available
-                            traceroute_data = traceroutes.get(node_id)
+            if update_node_pages_module:
+                
+                # Count how many pages we update
+                pages_updated = 0
+                _debug("Starting node page updates...")
+                
+                # For each node with telemetry data, create/update its page
+                for node in sorted_nodes:
+                    node_id = node.get("id", "")
+                    if node_id:
+                        # Get latest telemetry for this node from the collected data
+                        telemetry_data = {metric: node[metric] for metric in _BASIC_METRICS if metric in node}
+                        
+                        _debug("Node %s metrics from node object: %s", node_id, list(telemetry_data))
+                        _debug("Node %s telemetry data extracted: %s", node_id, telemetry_data)
+                        
+                        # If telemetry data is empty, use the latest logged values for this node
+                        if not telemetry_data:
+                            if historical_telemetry is None:
+                                historical_telemetry = _load_latest_telemetry(tele_csv)
+                            normalized_node_id = node_id.strip('!')
+                            telemetry_data.update(historical_telemetry.get(normalized_node_id, {}))
+                            _debug("Loaded historical telemetry data for %s: %s", normalized_node_id, telemetry_data)
+                        
+                            # Get node data from all_nodes dictionary (if available)
+                        if node_id in all_nodes:
+                            node_info = all_nodes.get(node_id, {})
+                            # Add node info to telemetry data
+                            for key, value in node_info.items():
+                                if key not in telemetry_data:  # Don't overwrite telemetry data with node info
+                                    telemetry_data[key] = value
+                            _debug("Enhanced telemetry data with node info from all_nodes for %s", node_id)
                             
-                            # Print debug information about telemetry and traceroute data
-                            print(f"[DEBUG] Node {node_id} telemetry data: {telemetry_data}")
-                            print(f"[DEBUG] Node {node_id} traceroute data: {traceroute_data}")                            # Update the node's page if we have telemetry OR traceroute data
-                            if telemetry_data or traceroute_data:
-                                print(f"[DEBUG] Updating page for node {node_id}")
-                                update_node_pages_module.update_node_pages(
-                                    node_id,
-                                    telemetry_data,
-                                    traceroute_data,
-                                    plot_outdir
-                                )
-                                pages_updated += 1
-                                pages_updated += 1
-                    
-                    if pages_updated > 0:
-                        print(f"[INFO] Updated {pages_updated} node pages with telemetry and traceroute data")
-                    else:
-                        print("[WARN] No node pages were updated - check if telemetry data is being collected", file=sys.stderr)
-                    
-                    # Print summary of pages updated
-                    if pages_updated > 0:
-                        print(f"[INFO] Updated {pages_updated} node pages with telemetry and traceroute data")
-                    else:
-                        print("[WARN] No node pages were updated initially - traceroute data will be applied after plotting")
+                        # Get traceroute data for this node if available
+                        traceroute_data = traceroutes.get(node_id)
+                        
+                        # Print debug information about telemetry and traceroute data
+                        _debug("Node %s telemetry data: %s", node_id, telemetry_data)
+                        _debug("Node %s traceroute data: %s", node_id, traceroute_data)
+                        # Update the node's page if we have telemetry OR traceroute data
+                        if telemetry_data or traceroute_data:
+                            _debug("Updating page for node %s", node_id)
+                            page_mtimes[node_id] = _render_node_page(
+                                update_node_pages_module,
+                                node_id,
+                                telemetry_data,
+                                traceroute_data,
+                                plot_outdir
+                            )
+                            pages_updated += 1
+                
+                # Print summary of pages updated
+                if pages_updated > 0:
+                    print(f"[INFO] Updated {pages_updated} node pages with telemetry and traceroute data")
                 else:
-                    print("[WARN] Could not load update_node_pages.py module", file=sys.stderr)
-            else:
-                print(f"[WARN] Node pages module not found at {update_node_pages_path}", file=sys.stderr)
+                    print("[WARN] No node pages were updated initially - traceroute data will be applied after plotting")
         except Exception as e:
             print(f"[ERROR] Failed to update node pages: {e}", file=sys.stderr)
         
@@ -799,129 +1079,53 @@ def main():
                 nodes_with_data.append(node)
         
         # Create dashboards.html with links to individual node pages
-        dashboards_html = f"""<!doctype html>
-<meta charset='utf-8'>
-<title>Node Dashboards</title>
-<style>
-body {{font-family: Arial, sans-serif; margin: 20px;}}
-.dashboard-grid {{
-    display: grid;
-    grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
-    gap: 20px;
-    margin-top: 20px;
-}}
-.node-card {{
-    border: 1px solid #ddd;
-    border-radius: 8px;
-    padding: 15px;
-    box-shadow: 0 2px 6px rgba(0,0,0,0.1);
-    transition: transform 0.2s, box-shadow 0.2s;
-}}
-.node-card:hover {{
-    transform: translateY(-5px);
-    box-shadow: 0 5px 15px rgba(0,0,0,0.15);
-}}
-.node-id {{
-    font-family: monospace;
-    background-color: #f5f5f5;
-    padding: 3px 6px;
-    border-radius: 3px;
-    font-size: 14px;
-    margin-left: 8px;
-}}
-.node-metrics {{
-    display: grid;
-    grid-template-columns: repeat(2, 1fr);
-    gap: 10px;
-    margin-top: 15px;
-}}
-.metric {{
-    background-color: #f9f9f9;
-    padding: 8px;
-    border-radius: 4px;
-    text-align: center;
-}}
-.metric-name {{
-    font-size: 12px;
-    color: #666;
-}}
-.metric-value {{
-    font-size: 16px;
-    font-weight: bold;
-    margin-top: 5px;
-}}
-.view-btn {{
-    display: inline-block;
-    background-color: #4CAF50;
-    color: white;
-    padding: 8px 16px;
-    border-radius: 4px;
-    margin-top: 15px;
-    text-decoration: none;
-    text-align: center;
-}}
-.view-btn:hover {{
-    background-color: #45a049;
-}}
-h1 {{margin-bottom: 10px;}}
-</style>
-<h1>Node Dashboards</h1>
-<p>Last updated: {iso_now()} - {len(nodes_with_data)} nodes with data</p>
+        dashboards_html = f"""<p>Last updated: {pages_ts} - {len(nodes_with_data)} nodes with data</p>
 <p><a href="index.html">Back to index</a></p>
 
 <div class="dashboard-grid">
 """
+        parts = [dashboards_html]
+        card_html = _DASHBOARD_CARD_HTML.format
         # Process each node for the dashboard
         for node in nodes_with_data:
             node_id = node.get("id", "")
             if not node_id:
                 continue
                 
-            clean_id = node_id.replace("!", "")
-            user = node.get("user", "Unknown")
-            aka = node.get("aka", "")
-            battery = node.get("battery_pct", "N/A")
-            voltage = node.get("voltage_v", "N/A")
+            labels = node_labels[node_id]
+            aka = labels["aka"]
             
             # Add node card with key metrics and link to its dedicated page
-            dashboards_html += f"""
-    <div class="node-card">
-        <h3>{user or "Unknown"} <span class="node-id">{node_id}</span></h3>
-        {f'<p>{aka}</p>' if aka else ''}
-        <div class="node-metrics">
-            <div class="metric">
-                <div class="metric-name">Battery</div>
-                <div class="metric-value">{battery}%</div>
-            </div>
-            <div class="metric">
-                <div class="metric-name">Voltage</div>
-                <div class="metric-value">{voltage} V</div>
-            </div>
-        </div>
-        <a href="node_{clean_id}/index.html" class="view-btn">View Details</a>
-    </div>"""
+            parts.append(card_html(
+                user=labels["user"] or "Unknown", node_id=labels["id"], aka=f'<p>{aka}</p>' if aka else '',
+                battery=html.escape(str(node.get("battery_pct", "N/A"))),
+                voltage=html.escape(str(node.get("voltage_v", "N/A"))),
+                clean_id=html.escape(node_id.replace("!", "")),
+            ))
         
-        dashboards_html += """
+        parts.append("""
 </div>
 </html>
-"""
+""")
+        dashboards_html = "".join(parts)
         # Write the dashboards HTML file
-        with dashboards_path.open("w", encoding="utf-8") as f:
-            f.write(dashboards_html)
+        _write_html(dashboards_path, dashboards_html, _DASHBOARDS_HEAD)
         print(f"[INFO] Generated dashboards.html with {len(nodes_with_data)} node cards")
         
         # Create a new file called nodes.html with all discovered nodes
         nodes_path = plot_outdir / "nodes.html"
-        nodes_html = f"""<!doctype html><meta charset='utf-8'><title>All Discovered Nodes</title>
-<style>
-body {{font-family: Arial, sans-serif; margin: 20px;}}
-table {{border-collapse: collapse; width: 100%;}}
-th, td {{text-align: left; padding: 8px; border: 1px solid #ddd;}}
-tr:nth-child(even) {{background-color: #f2f2f2;}}
-th {{background-color: #4CAF50; color: white;}}
-</style>
-<h1>All Discovered Nodes ({len(nodes_with_data)})</h1>
-<p>Last updated: {iso_now()}</p>
+        node_rows = []
+        for node in nodes_with_data:
+            labels = node_labels[node["id"]]
+            node_rows.append(_NODES_ROW_HTML.format(
+                user=labels["user"], node_id=labels["id"], aka=labels["aka"] if "aka" in node else "Unknown",
+                last_seen=html.escape(str(node.get("last_seen", "Unknown"))),
+                latitude=html.escape(str(node.get("latitude", "N/A"))),
+                longitude=html.escape(str(node.get("longitude", "N/A"))),
+                hops=html.escape(str(node.get("hops", "N/A"))),
+            ))
+        nodes_html = f"""<h1>All Discovered Nodes ({len(nodes_with_data)})</h1>
+<p>Last updated: {pages_ts}</p>
 <table>
 <thead>
     <tr>
@@ -934,35 +1138,18 @@ th {{background-color: #4CAF50; color: white;}}
     </tr>
 </thead>
 <tbody>
-{"".join([f"<tr><td>{node.get('user', 'Unknown')}</td><td>{node.get('id', 'Unknown')}</td><td>{node.get('aka', 'Unknown')}</td><td>{node.get('last_seen', 'Unknown')}</td><td>{node.get('latitude', 'N/A')}, {node.get('longitude', 'N/A')}</td><td>{node.get('hops', 'N/A')}</td></tr>" for node in nodes_with_data])}
+{"".join(node_rows)}
 </tbody>
 </table>
 <p><a href='index.html'>Back to index</a></p>
 """
-        with nodes_path.open("w", encoding="utf-8") as f:
-            f.write(nodes_html)
+        _write_html(nodes_path, nodes_html, _NODES_HEAD)
         print(f"[INFO] Generated nodes.html with {len(nodes_with_data)} nodes")
         
         # Create our own custom index.html file with links to everything
         index_path = plot_outdir / "index.html"
-        index_html = f"""<!doctype html>
-<meta charset='utf-8'>
-<meta name='viewport' content='width=device-width,initial-scale=1'>
-<title>Meshtastic Telemetry & Traceroute</title>
-<style>
-    body {{font-family: Arial, sans-serif; margin: 20px;}}
-    .card-container {{display: flex; flex-wrap: wrap; gap: 20px; margin-top: 20px;}}
-    .card {{
-        border: 1px solid #ddd; border-radius: 8px; padding: 20px;
-        width: 300px; box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-    }}
-    h1, h2 {{color: #333;}}
-    a {{text-decoration: none; color: #0066cc;}}
-    a:hover {{text-decoration: underline;}}
-    .stats {{background-color: #f5f5f5; padding: 10px; border-radius: 5px; margin-top: 20px;}}
-</style>
-<h1>Meshtastic Telemetry & Traceroute</h1>
-<p>Last updated: {iso_now()}</p>
+        topology_images = _topology_images(plot_outdir)[:6]
+        index_html = f"""<p>Last updated: {pages_ts}</p>
 
 <div class="stats">
     <h3>Statistics</h3>
@@ -1000,116 +1187,56 @@ th {{background-color: #4CAF50; color: white;}}
 
 <h2>Topology Snapshots</h2>
 <div class="card-container">
-{"".join([f'<div class="card"><img src="{topo_file}" alt="{topo_file}" style="max-width:100%;"></div>' for topo_file in [f for f in os.listdir(plot_outdir) if f.startswith('topology_') and f.endswith('.png')][:6]])}
+{"".join([f'<div class="card"><img src="{topo_file}" alt="{topo_file}" style="max-width:100%;"></div>' for topo_file in topology_images])}
 </div>
 """
-        with index_path.open("w", encoding="utf-8") as f:
-            f.write(index_html)
+        _write_html(index_path, index_html, _INDEX_HEAD)
         print("[INFO] Generated index.html with navigation and statistics")
 
         # Create pages for all nodes found via meshtastic --nodes
         print("[INFO] Creating pages for all discovered nodes...")
-        success, nodes_output = run_cli(["meshtastic", "--nodes"])
-        all_discovered_nodes = []
+        try:
+            all_discovered_nodes, listed_nodes = _parse_nodes_table(iter_cli_lines(["meshtastic", "--nodes"]))
+            success = True
+        except RuntimeError:
+            success = False
         if success:
-            # Parse the nodes output to extract all node IDs
-            lines = nodes_output.splitlines()
-            for line in lines:
-                    if "!" in line and "│" in line:
-                        parts = line.split("│")
-                        if len(parts) >= 3:  # Node ID is typically in the 3rd column
-                            node_id = parts[2].strip()
-                            if node_id.startswith("!") and len(node_id) > 1:
-                                all_discovered_nodes.append(node_id)
-                                
-                                # Extract all node information from the line
-                                if len(parts) >= 15:  # Ensure we have enough parts to parse
-                                    node_info = {
-                                        'user': parts[1].strip(),
-                                        'id': parts[2].strip(),
-                                        'aka': parts[3].strip(),
-                                        'hardware': parts[4].strip(),
-                                        'key': parts[5].strip(),
-                                        'firmware': parts[6].strip(),
-                                        'latitude': parts[7].strip(),
-                                        'longitude': parts[8].strip(),
-                                        'altitude': parts[9].strip(),
-                                        'signal_strength': parts[10].strip(),
-                                        'channel_util_pct': float(parts[11].strip().rstrip('%')) if parts[11].strip().rstrip('%').replace('.', '', 1).isdigit() else 0.0,
-                                        'air_tx_pct': float(parts[12].strip().rstrip('%')) if parts[12].strip().rstrip('%').replace('.', '', 1).isdigit() else 0.0,
-                                        'hops': parts[13].strip(),
-                                        'last_seen': parts[14].strip()
-                                    }
-                                    
-                                    # Store this information in all_nodes
-                                    all_nodes[node_id] = node_info
+            all_nodes.update(listed_nodes)
             
             print(f"[INFO] Found {len(all_discovered_nodes)} nodes from meshtastic --nodes")
             
-            # Load the update_node_pages module if not already loaded
-            if 'update_node_pages_module' not in locals():
-                update_node_pages_path = Path(__file__).parent / "update_node_pages.py"
-                if update_node_pages_path.exists():
-                    try:
-                        spec = importlib.util.spec_from_file_location("update_node_pages", update_node_pages_path)
-                        update_node_pages_module = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(update_node_pages_module)
-                    except Exception as e:
-                        print(f"[WARN] Could not load update_node_pages.py module: {e}", file=sys.stderr)
-                        update_node_pages_module = None
-                else:
-                    print(f"[WARN] Node pages module not found at {update_node_pages_path}", file=sys.stderr)
-                    update_node_pages_module = None
-            
             # Create or update pages for all discovered nodes
             if update_node_pages_module:
                 pages_created = 0
+                # The latest logged telemetry is parsed once per cycle and
+                # shared by all nodes
+                if all_discovered_nodes and historical_telemetry is None:
+                    historical_telemetry = _load_latest_telemetry(tele_csv)
                 for node_id in all_discovered_nodes:
-                    # Get the normalized node ID (without ! prefix)
-                    normalized_node_id = node_id.strip('!')
-                    
                     # Get node data from all_nodes dictionary (if available)
-                    node_data = {}
-                    
-                    # Check if we have the node in our all_nodes dictionary
-                    if node_id in all_nodes:
-                        node_data = all_nodes.get(node_id, {})
-                        print(f"[DEBUG] Found existing node data for {node_id}: {node_data}")
+                    node_data = all_nodes.get(node_id)
+                    if node_data is None:
+                        node_data = {}
+                    else:
+                        _debug("Found existing node data for %s: %s", node_id, node_data)
                     
                     # For nodes from nodes table, make sure node_info is included in telemetry data
                     # These values are already in node_data from all_nodes, no need to create a separate dictionary
                     
-                    # Also try to load historical telemetry data
-                    normalized_node_id = node_id.strip('!')
-                    telemetry_file = Path(args.output)
-                    
-                    # Try to load historical telemetry data
-                    if telemetry_file.exists():
-                        try:
-                            df = pd.read_csv(telemetry_file)
-                            # Filter for this node
-                            node_data_df = df[df['node_id'] == normalized_node_id]
-                            if not node_data_df.empty:
-                                # Get the latest row
-                                latest_row = node_data_df.iloc[-1]
-                                # Add metrics to node_data
-                                for col in df.columns:
-                                    if col != 'node_id' and col != 'timestamp':
-                                        try:
-                                            node_data[col] = latest_row[col]
-                                        except:
-                                            pass
-                        except Exception as e:
-                            print(f"[WARN] Error loading telemetry for {node_id}: {e}", file=sys.stderr)
-                            
-                        print(f"[DEBUG] Enhanced node data with telemetry for {node_id}: {node_data}")
+                    # Also add the latest logged telemetry for this node. Work on
+                    # a copy so all_nodes (saved to nodes.json) is left untouched.
+                    latest_metrics = historical_telemetry.get(node_id.strip('!'))
+                    if latest_metrics:
+                        node_data = {**node_data, **latest_metrics}
+                        _debug("Enhanced node data with telemetry for %s: %s", node_id, node_data)
                     
                     # Get traceroute data for this node (if available)
                     traceroute_data = traceroutes.get(node_id)
                     
                     # Create/update the node page
                     try:
-                        update_node_pages_module.update_node_pages(
+                        page_mtimes[node_id] = _render_node_page(
+                            update_node_pages_module,
                             node_id,
                             node_data,
                             traceroute_data,
@@ -1135,91 +1262,59 @@ th {{background-color: #4CAF50; color: white;}}
                 # Add regenerate-charts flag if specified
                 if args.regenerate_charts:
                     plot_cmd.append("--regenerate-charts")
-                subprocess.run(plot_cmd, check=False)
+                plot_proc = subprocess.Popen(plot_cmd)
+                try:
+                    # The re-apply step below needs the logged telemetry but not
+                    # the plots, so load it while plot_meshtastic.py runs
+                    if traceroutes and historical_telemetry is None:
+                        historical_telemetry = _load_latest_telemetry(tele_csv)
+                    plot_proc.wait()
+                except BaseException:
+                    plot_proc.kill()
+                    plot_proc.wait()
+                    raise
                 print(f"[INFO] Plots generated in {args.plot_outdir}/")
                 
                 # Re-run our update_node_pages for each node with traceroute data to restore traceroute visualizations
-                print("[DEBUG] Re-applying traceroute visualizations after plotting...")
+                _debug("Re-applying traceroute visualizations after plotting...")
                 
-                # Import the NodePageUpdater class
-                node_updater_path = Path(__file__).parent / "node_page_updater.py"
-                if node_updater_path.exists():
+                if update_node_pages_module:
                     try:
-                        spec = importlib.util.spec_from_file_location("node_page_updater", node_updater_path)
-                        if spec and spec.loader:
-                            node_updater_module = importlib.util.module_from_spec(spec)
-                            spec.loader.exec_module(node_updater_module)
-                            
-                            # Create a NodePageUpdater
-                            updater = node_updater_module.NodePageUpdater(args.plot_outdir)
-                            
-                            # First update nodes with traceroute data
-                            if traceroutes:
-                                for node_id, tr_data in traceroutes.items():
-                                    # We need to reuse existing telemetry data for this node
-                                    print(f"[DEBUG] Re-applying traceroute visualization for {node_id}")
-                                    
-                                    # First try to extract telemetry from the current data
-                                    node_telemetry = {}
+                        # First update nodes with traceroute data
+                        if traceroutes:
+                            for node_id, tr_data in traceroutes.items():
+                                # Only re-render pages that plotting actually rewrote;
+                                # an unchanged mtime means our traceroute page is intact
+                                page_path = plot_outdir / f"node_{node_id.strip('!')}" / "index.html"
+                                if node_id in page_mtimes and page_mtimes[node_id] == _page_mtime(page_path):
+                                    continue
+                                
+                                # We need to reuse existing telemetry data for this node
+                                _debug("Re-applying traceroute visualization for %s", node_id)
+                                
+                                # First try to extract telemetry from the current data
+                                node_telemetry = {}
+                                
+                                # Try to find the node in all_nodes
+                                node_found = False
+                                for node in all_nodes_list:
+                                    if node.get("id") == node_id:
+                                        node_found = True
+                                        # Extract known telemetry metrics
+                                        for metric in _BASIC_METRICS:
+                                            if metric in node:
+                                                node_telemetry[metric] = node[metric]
                                     
-                                    # Try to find the node in all_nodes
-                                    node_found = False
-                                    for node in all_nodes_list:
-                                        if node.get("id") == node_id:
-                                            node_found = True
-                                            # Extract known telemetry metrics
-                                            for metric in ["battery_pct", "voltage_v", "channel_util_pct", "air_tx_pct", "uptime_s"]:
-                                                if metric in node:
-                                                    node_telemetry[metric] = node[metric]
-                                        
-                                    # If not found in current data or no telemetry, try to load from history
-                                    if not node_found or not node_telemetry:
-                                        try:
-                                            # Use a better matching approach for node IDs
-                                            normalized_node_id = node_id.strip('!')
-                                            print(f"[DEBUG] Looking for historical data for node {node_id} in telemetry_log.csv")
-                                            
-                                            # Use subprocess to safely grep the file
-                                            try:
-                                                # Use grep with -F for fixed strings to avoid regex interpretation
-                                                grep_result = subprocess.run(
-                                                    ["grep", normalized_node_id, "telemetry_log.csv"],
-                                                    capture_output=True,
-                                                    text=True,
-                                                    check=False  # Don't raise exception if grep doesn't find matches
-                                                )
-                                                if grep_result.stdout:
-                                                    matching_lines = grep_result.stdout.strip().split('\n')
-                                                    
-                                                    # For each metric, find the most recent non-empty value
-                                                    if matching_lines:
-                                                        # Initialize metrics we want to find
-                                                        metrics = ["battery_pct", "voltage_v", "channel_util_pct", "air_tx_pct", "uptime_s"]
-                                                        
-                                                        # Start from the most recent entries
-                                                        for line in reversed(matching_lines):
-                                                            parts = line.split(",")
-                                                            if len(parts) >= 7:  # Make sure line has enough fields
-                                                                # Check each metric position
-                                                                for i, metric in enumerate(metrics):
-                                                                    # Only process if we haven't found this metric yet
-                                                                    if metric not in node_telemetry and parts[i+2].strip():
-                                                                        try:
-                                                                            node_telemetry[metric] = float(parts[i+2])
-                                                                        except ValueError:
-                                                                            pass  # Ignore invalid values
-                                                
-                                                                # If we found all metrics, we can stop searching
-                                                                if all(m in node_telemetry for m in metrics):
-                                                                    break
-                                            except Exception as e:
-                                                print(f"[WARN] Error using grep to find node data: {e}", file=sys.stderr)
-                                            
-                                            print(f"[DEBUG] Loaded historical telemetry data for {node_id}: {node_telemetry}")
-                                        except Exception as e:
-                                            print(f"[WARN] Error loading historical data for {node_id}: {e}", file=sys.stderr)
+                                # If not found in current data or no telemetry, use the latest logged values
+                                if not node_found or not node_telemetry:
+                                    if historical_telemetry is None:
+                                        historical_telemetry = _load_latest_telemetry(tele_csv)
+                                    for metric, value in historical_telemetry.get(node_id.strip('!'), {}).items():
+                                        node_telemetry.setdefault(metric, value)
+                                    _debug("Loaded historical telemetry data for %s: %s", node_id, node_telemetry)
                                 
-                                update_node_pages_module.update_node_pages(
+                                _render_node_page(
+                                    update_node_pages_module,
                                     node_id,
                                     node_telemetry,  # Use the loaded telemetry data
                                     tr_data,
@@ -1233,7 +1328,7 @@ th {{background-color: #4CAF50; color: white;}}
                 dashboard_updater = Path(__file__).parent / "update_dashboard.py"
                 if dashboard_updater.exists():
                     try:
-                        subprocess.run(["python3", str(dashboard_updater)], check=False)
+                        _run_dashboard_update(dashboard_updater)
                         print("[INFO] Dashboard layout updated successfully")
                     except Exception as e:
                         print(f"[WARN] Dashboard update failed: {e}", file=sys.stderr)
@@ -1242,12 +1337,8 @@ th {{background-color: #4CAF50; color: white;}}
 
         if args.once:
             break
-        # sleep until next cycle
-        for _ in range(int(args.interval*10)):
-            if _stop:
-                break
-            time.sleep(0.1)
-        if _stop:
+        # sleep until next cycle, waking straight away on SIGINT/SIGTERM
+        if _stop.wait(timeout=args.interval):
             break
 
 if __name__ == "__main__":
@@ -19,9 +19,12 @@ Usage examples:
         --outdir plots
 """
 import argparse
+import io
 from pathlib import Path
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # files only; also safe when imported into a long-running logger
 import matplotlib.pyplot as plt
 import sys
 import os
@@ -36,6 +39,13 @@ except ImportError:
     print("[WARN] Could not import html_templates, using fallback styling", file=sys.stderr)
     TEMPLATES_AVAILABLE = False
 
+# Use the multi-threaded pyarrow CSV reader when it is installed
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 def ensure_outdir(p: Path):
     p.mkdir(parents=True, exist_ok=True)
 
@@ -48,21 +58,67 @@ def create_timestamped_output_dir(base_outdir: Path) -> Path:
     # Create the timestamped directory
     timestamped_dir.mkdir(parents=True, exist_ok=True)
     
-    # Update the 'latest' symlink (remove existing one first)
-    if latest_link.exists() or latest_link.is_symlink():
-        latest_link.unlink()
-    latest_link.symlink_to(timestamp, target_is_directory=True)
+    # Update the 'latest' symlink by renaming a fresh link over the old one
+    tmp_link = base_outdir / ".latest.tmp"
+    if tmp_link.is_symlink():
+        tmp_link.unlink()
+    tmp_link.symlink_to(timestamp, target_is_directory=True)
+    os.replace(tmp_link, latest_link)
     
     return timestamped_dir
 
-def parse_args():
+def parse_args(argv=None):
     ap = argparse.ArgumentParser(description="Plot Meshtastic telemetry & traceroute CSVs (v3, merge-aware)")
     ap.add_argument("--telemetry", nargs="+", required=True, help="One or more telemetry CSVs")
     ap.add_argument("--traceroute", nargs="+", required=True, help="One or more traceroute CSVs")
     ap.add_argument("--outdir", default="plots", help="Output directory for PNGs and HTML")
     ap.add_argument("--regenerate-charts", action="store_true", help="Force regeneration of all charts")
     ap.add_argument("--preserve-history", action="store_true", help="Create timestamped directory and preserve history")
-    return ap.parse_args()
+    return ap.parse_args(argv)
+
+def _parse_csv(source, path, **kwargs):
+    """Parse a CSV with the pyarrow engine if available, else pandas' C parser."""
+    if PYARROW_AVAILABLE:
+        try:
+            return pd.read_csv(source, engine="pyarrow", **kwargs)
+        except Exception as e:
+            print(f"[WARN] pyarrow could not parse {path} ({e}), using default parser")
+            if hasattr(source, "seek"):
+                source.seek(0)
+    return pd.read_csv(source, **kwargs)
+
+# Parsed CSVs kept between runs in the same process (the logger calls main()
+# every cycle): abspath -> (bytes parsed, leading bytes, DataFrame). The logs
+# are append-only, so when a file has only grown just the new rows are parsed.
+_CSV_CACHE = {}
+_CSV_HEAD_BYTES = 4096
+
+def _read_csv(path):
+    """Read a CSV, parsing only rows appended since the last read when possible."""
+    key = os.path.abspath(path)
+    with open(path, "rb") as f:
+        cached = _CSV_CACHE.get(key)
+        if cached is not None:
+            offset, head, df = cached
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(0)
+            if size >= offset and f.read(len(head)) == head:
+                f.seek(offset)
+                tail = f.read()
+                # Only complete lines; a row still being written is left for next time
+                tail = tail[:tail.rfind(b"\n") + 1]
+                if tail:
+                    new_rows = _parse_csv(io.BytesIO(tail), path, header=None, names=list(df.columns))
+                    df = pd.concat([df, new_rows], ignore_index=True)
+                    _CSV_CACHE[key] = (offset + len(tail), head, df)
+                return df
+            f.seek(0)
+        data = f.read()
+    complete = data[:data.rfind(b"\n") + 1] or data
+    df = _parse_csv(io.BytesIO(complete), path)
+    _CSV_CACHE[key] = (len(complete), complete[:_CSV_HEAD_BYTES], df)
+    return df
 
 def read_merge_telemetry(paths):
     need = ["timestamp","node","battery_pct","voltage_v","channel_util_pct","air_tx_pct","uptime_s",
@@ -71,7 +127,7 @@ def read_merge_telemetry(paths):
            "ch3_voltage_v","ch3_current_ma","ch4_voltage_v","ch4_current_ma"]
     frames = []
     for p in paths:
-        df = pd.read_csv(p)
+        df = _read_csv(p)
         missing = [c for c in need if c not in df.columns]
         if missing:
             print(f"[WARN] Skip {p}: missing columns {missing}")
@@ -80,7 +136,8 @@ def read_merge_telemetry(paths):
     if not frames:
         return pd.DataFrame(columns=need)
 
-    df = pd.concat(frames, ignore_index=True)
+    # A single CSV (the usual case) is used as-is rather than copied again by concat
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
     df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
     for col in ["battery_pct","voltage_v","channel_util_pct","air_tx_pct","uptime_s",
                "temperature_c","humidity_pct","pressure_hpa","iaq","lux","current_ma",
@@ -97,7 +154,7 @@ def read_merge_traceroute(paths):
     need = ["timestamp","dest","direction","hop_index","from","to","link_db"]
     frames = []
     for p in paths:
-        df = pd.read_csv(p)
+        df = _read_csv(p)
         missing = [c for c in need if c not in df.columns]
         if missing:
             print(f"[WARN] Skip {p}: missing columns {missing}")
@@ -106,7 +163,8 @@ def read_merge_traceroute(paths):
     if not frames:
         return pd.DataFrame(columns=need)
 
-    df = pd.concat(frames, ignore_index=True)
+    # A single CSV (the usual case) is used as-is rather than copied again by concat
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
     df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
     df["hop_index"] = pd.to_numeric(df["hop_index"], errors="coerce")
     df["link_db"] = pd.to_numeric(df["link_db"], errors="coerce")
@@ -131,6 +189,20 @@ def _fmt_ts(ts):
     except Exception:
         return str(ts)
 
+def _write_if_changed(path: Path, text: str) -> bool:
+    """Write text to path unless the file already holds exactly that content.
+
+    Returns True if the file was written.
+    """
+    data = text.encode("utf-8")
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.write_bytes(data)
+    return True
+
 def diagnostics(df_tele, df_trace, outdir: Path, sources_tele, sources_trace):
     # Calculate estimated battery runtime for each node
     est_runtimes = {}
@@ -517,7 +589,7 @@ def plot_per_node_dashboards(df: pd.DataFrame, outdir: Path, force_regenerate=Fa
                 html.append(f"<figure><figcaption>{title}</figcaption><a href='{img}'><img src='{img}' alt='{img}'></a></figure>")
             html.append("</div>")
             html.append("<p><a href='../index.html'>Back to index</a></p>")
-            (node_dir / "index.html").write_text("\n".join(html), encoding="utf-8")
+            _write_if_changed(node_dir / "index.html", "\n".join(html))
             dashboards[node] = node_dir
     if dashboards:
         lines = ["<!doctype html><meta charset='utf-8'><title>Per-Node Dashboards</title><h1>Per-Node Dashboards</h1><ul>"]
@@ -525,7 +597,7 @@ def plot_per_node_dashboards(df: pd.DataFrame, outdir: Path, force_regenerate=Fa
             rel = p.name + "/index.html"
             lines.append(f"<li><a href='{rel}'>Node {node}</a></li>")
         lines.append("</ul>")
-        (outdir / "dashboards.html").write_text("\n".join(lines), encoding="utf-8")
+        _write_if_changed(outdir / "dashboards.html", "\n".join(lines))
 
 def plot_traceroute_timeseries(df: pd.DataFrame, outdir: Path):
     if df.empty:
@@ -903,6 +975,11 @@ def _fallback_nodes_html(node_stats, all_nodes, tele_nodes, trace_nodes):
 </body>
 </html>"""
 
+def _list_topology_images(outdir: Path):
+    """Return sorted topology snapshot filenames using a single directory scan."""
+    with os.scandir(outdir) as it:
+        return sorted(e.name for e in it if e.name.startswith("topology_") and e.name.endswith(".png"))
+
 def write_root_index(outdir: Path):
     """Enhanced root index with modern styling and comprehensive navigation using standardized template"""
     
@@ -979,7 +1056,7 @@ def _build_root_index_content(outdir: Path):
             """)
     
     # Topology snapshots section
-    topo_imgs = sorted([p.name for p in outdir.glob("topology_*.png")])
+    topo_imgs = _list_topology_images(outdir)
     topo_cards = []
     for img in topo_imgs:
         topo_title = img.replace('_', ' ').replace('.png', '').title()
@@ -1057,7 +1134,7 @@ def _fallback_root_index_html(outdir: Path, content: str):
     # Count available files to show status
     nav_files = len([f for f in ["nodes.html", "dashboards.html", "diagnostics.html"] if (outdir / f).exists()])
     chart_files = len([f for f in ["traceroute_hops.png", "traceroute_bottleneck_db.png"] if (outdir / f).exists()])
-    topo_files = len(list(outdir.glob("topology_*.png")))
+    topo_files = len(_list_topology_images(outdir))
     
     return f"""<!DOCTYPE html>
 <html lang="en">
@@ -1094,8 +1171,9 @@ def _fallback_root_index_html(outdir: Path, content: str):
 </body>
 </html>"""
 
-def main():
-    args = parse_args()
+def main(argv=None):
+    """Run the plotter; argv defaults to the command line (for in-process callers)."""
+    args = parse_args(argv)
     base_outdir = Path(args.outdir)
     
     # Handle history preservation
@@ -10,10 +10,11 @@ import sys
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.cli_utils import validate_node_id, validate_serial_device, build_meshtastic_command
-from core.csv_utils import iso_now, ensure_header, append_row
+from core.cli_utils import run_cli, iter_cli_lines, terminate_running_commands, validate_node_id, validate_serial_device, build_meshtastic_command
+from core.csv_utils import iso_now, ensure_header, append_row, append_rows, write_atomic, dump_json, load_json
 from core.node_discovery import normalize_node_id
-from core.telemetry import _collect_direct_telemetry
+from core.telemetry import _collect_direct_telemetry, _parse_telemetry_output, collect_telemetry_batch
+from core.traceroute import _parse_traceroute_output
 
 
 class TestCliUtils(unittest.TestCase):
@@ -39,6 +40,8 @@ class TestCliUtils(unittest.TestCase):
         self.assertFalse(validate_node_id("ab-c"))
         self.assertFalse(validate_node_id("ab c"))
         self.assertFalse(validate_node_id("ab.c"))
+        self.assertFalse(validate_node_id("abc\n"))
+        self.assertFalse(validate_node_id("äbc"))
     
     def test_validate_serial_device(self):
         """Test serial device validation."""
@@ -52,6 +55,52 @@ class TestCliUtils(unittest.TestCase):
         self.assertFalse(validate_serial_device("/dev/null"))
         self.assertFalse(validate_serial_device("ttyUSB0"))
         self.assertFalse(validate_serial_device("/dev/tty"))
+        self.assertFalse(validate_serial_device("/dev/ttyUSB"))
+        self.assertFalse(validate_serial_device("/dev/tty0"))
+        self.assertFalse(validate_serial_device("/dev/ttyusb0"))
+    
+    def test_run_cli(self):
+        """Test CLI execution results, timeouts and shutdown termination."""
+        import threading
+        import time
+        
+        self.assertEqual(run_cli([sys.executable, "-c", "print('ok')"]), (True, "ok\n"))
+        self.assertEqual(run_cli([sys.executable, "-c", "import sys; print('bad'); sys.exit(2)"]), (False, "bad\n"))
+        self.assertEqual(run_cli([sys.executable, "-c", "import time; time.sleep(5)"], timeout=0.2), (False, "[TIMEOUT]"))
+        self.assertFalse(run_cli(["/nonexistent/meshtastic"])[0])
+        self.assertEqual(run_cli([]), (False, "[INVALID_CMD]"))
+        
+        # A running command is stopped by terminate_running_commands(), and no
+        # further commands are started afterwards
+        from unittest.mock import patch
+        with patch('core.cli_utils._stopping', False):
+            threading.Timer(0.3, terminate_running_commands).start()
+            start = time.monotonic()
+            success, _ = run_cli([sys.executable, "-c", "import time; time.sleep(10)"], timeout=10)
+            self.assertFalse(success)
+            self.assertLess(time.monotonic() - start, 5)
+            self.assertEqual(run_cli([sys.executable, "-c", "print('ok')"]), (False, "[STOPPED]"))
+        
+        # An interrupt while waiting kills the command and forgets it
+        import subprocess
+        from core import cli_utils
+        real_kill = subprocess.Popen.kill
+        with patch.object(subprocess.Popen, 'communicate', side_effect=KeyboardInterrupt), \
+                patch.object(subprocess.Popen, 'kill', autospec=True, side_effect=real_kill) as mock_kill:
+            with self.assertRaises(KeyboardInterrupt):
+                run_cli([sys.executable, "-c", "import time; time.sleep(10)"])
+        self.assertIsNotNone(mock_kill.call_args[0][0].returncode)
+        self.assertEqual(cli_utils._running_procs, set())
+    
+    def test_iter_cli_lines(self):
+        """Test streamed CLI output and failure reporting."""
+        self.assertEqual(list(iter_cli_lines([sys.executable, "-c", "print('a'); print('b')"])), ["a\n", "b\n"])
+        with self.assertRaisesRegex(RuntimeError, "PROCESS_ERROR"):
+            list(iter_cli_lines([sys.executable, "-c", "import sys; print('bad'); sys.exit(2)"]))
+        with self.assertRaisesRegex(RuntimeError, "TIMEOUT"):
+            list(iter_cli_lines([sys.executable, "-c", "import time; time.sleep(5)"], timeout=0.2))
+        with self.assertRaises(RuntimeError):
+            list(iter_cli_lines(["/nonexistent/meshtastic"]))
     
     def test_build_meshtastic_command(self):
         """Test meshtastic command building."""
@@ -93,6 +142,11 @@ class TestCsvUtils(unittest.TestCase):
             ensure_header(csv_path, ["col1", "col2", "col3"])
             content = csv_path.read_text()
             self.assertTrue(content.startswith("col1,col2,col3"))
+            self.assertIn("data,row", content)
+            
+            # Test that a matching header is left untouched
+            ensure_header(csv_path, ["col1", "col2", "col3"])
+            self.assertEqual(csv_path.read_text(), content)
             
         finally:
             csv_path.unlink(missing_ok=True)
@@ -115,6 +169,33 @@ class TestCsvUtils(unittest.TestCase):
             
         finally:
             csv_path.unlink(missing_ok=True)
+    
+    def test_append_rows(self):
+        """Test appending several CSV rows at once."""
+        with tempfile.NamedTemporaryFile(mode='w+', delete=False) as f:
+            csv_path = Path(f.name)
+        
+        try:
+            append_row(csv_path, ["value1", "value2", 123])
+            append_rows(csv_path, [["value3", "", 4.5], ["value5", "value6", 789]])
+            append_rows(csv_path, [])
+            
+            self.assertEqual(csv_path.read_text(), "value1,value2,123\nvalue3,,4.5\nvalue5,value6,789\n")
+            
+        finally:
+            csv_path.unlink(missing_ok=True)
+    
+    def test_write_atomic_json(self):
+        """Test atomic file replacement with JSON snapshots."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            json_path = Path(tmpdir) / "nodes.json"
+            write_atomic(json_path, b"old contents that are longer")
+            write_atomic(json_path, dump_json({"total_tries": 2, "nodes": ["!abc123"]}))
+            
+            self.assertEqual(json_path.read_bytes(), b'{"total_tries":2,"nodes":["!abc123"]}')
+            self.assertEqual(load_json(json_path.read_bytes())["nodes"], ["!abc123"])
+            self.assertEqual(dump_json({"a": 1}, indent=True), b'{\n  "a": 1\n}')
+            self.assertEqual([p.name for p in Path(tmpdir).iterdir()], ["nodes.json"])
 
 
 class TestTelemetry(unittest.TestCase):
@@ -161,6 +242,81 @@ class TestTelemetry(unittest.TestCase):
             basic_decimal_command = ["meshtastic", "--request-telemetry", "--dest", "1828779180"]
             basic_decimal_found = any(call == basic_decimal_command for call in calls)
             self.assertTrue(basic_decimal_found, f"Should include basic telemetry command for decimal ID, got calls: {calls}")
+    
+    def test_direct_telemetry_unreachable_node(self):
+        """Test that sensor requests are skipped when the default request times out."""
+        from unittest.mock import patch
+        
+        with patch('core.telemetry.run_cli', return_value=(False, "[TIMEOUT]")) as mock_run_cli:
+            self.assertIsNone(_collect_direct_telemetry("!ba4bf9d0"))
+        
+        # Only the default request, no per-sensor requests or basic retry
+        calls = [call[0][0] for call in mock_run_cli.call_args_list]
+        basic_command = ["meshtastic", "--request-telemetry", "--dest", "!ba4bf9d0"]
+        self.assertEqual(calls, [basic_command])
+
+
+    def test_parse_telemetry_output(self):
+        """Test single-pass parsing of telemetry CLI output."""
+        output = (
+            "Battery level: 105%\n"
+            "Voltage: 4.1 V\n"
+            "Total channel utilization: 12.5%\n"
+            "Uptime: 3600 s\n"
+            "Channel 1 voltage: 3.3 V\n"
+            "Channel 1 current: 10 mA\n"
+            "Voltage: 3.0 V\n"
+        )
+        telemetry = _parse_telemetry_output(output)
+        
+        # Battery is clamped, first reading of a metric wins
+        self.assertEqual(telemetry["battery_pct"], 100.0)
+        self.assertEqual(telemetry["voltage_v"], 4.1)
+        self.assertEqual(telemetry["channel_util_pct"], 12.5)
+        self.assertEqual(telemetry["uptime_s"], 3600.0)
+        self.assertEqual(telemetry["ch1_voltage_v"], 3.3)
+        self.assertEqual(telemetry["ch1_current_ma"], 10.0)
+        self.assertNotIn("air_tx_pct", telemetry)
+        self.assertEqual(_parse_telemetry_output("no telemetry here"), {})
+    
+    def test_collect_telemetry_batch_concurrent(self):
+        """Test that concurrent batch collection keeps node order and skips failures."""
+        from unittest.mock import patch
+        
+        nodes_table = [{"id": "!a", "battery_pct": 50.0}]
+        
+        def fake_collect(node_id, serial_dev, timeout, nodes_data=None):
+            self.assertIs(nodes_data, nodes_table)
+            return None if node_id == "!bad" else {"battery_pct": float(len(node_id))}
+        
+        with patch('core.telemetry.collect_nodes_detailed', return_value=nodes_table) as mock_nodes, \
+             patch('core.telemetry.collect_telemetry_cli', side_effect=fake_collect):
+            results = collect_telemetry_batch(["!a", "!bad", "!ccc"], max_workers=4)
+        
+        # The node table is fetched once for the whole batch
+        mock_nodes.assert_called_once()
+        self.assertEqual(list(results), ["!a", "!ccc"])
+        self.assertEqual(results["!ccc"], {"battery_pct": 4.0})
+
+
+class TestTraceroute(unittest.TestCase):
+    """Test traceroute functions."""
+    
+    def test_parse_traceroute_output(self):
+        """Test single-pass parsing of traceroute CLI output."""
+        output = (
+            "0 !ignored !before 1.0 ms\n"
+            "traceroute to !dest\n"
+            "  1 !a !b 12.5 ms\n"
+            "2 !b\n"
+            "traceroute from !dest\r\n"
+            "1 !b !a 3 ms\r\n"
+        )
+        hops = _parse_traceroute_output(output)
+        
+        self.assertEqual(hops["forward"], [("!a", "!b", 12.5)])
+        self.assertEqual(hops["back"], [("!b", "!a", 3.0)])
+        self.assertEqual(_parse_traceroute_output(""), {"forward": [], "back": []})
 
 
 class TestNodeDiscovery(unittest.TestCase):
@@ -173,5 +329,41 @@ class TestNodeDiscovery(unittest.TestCase):
         self.assertEqual(normalize_node_id(""), "")
 
 
+class TestNodePageRendering(unittest.TestCase):
+    """Test node page rendering in the legacy logger."""
+
+    def test_render_node_page_skips_unchanged_data(self):
+        """Test that an unchanged node page is not rendered again."""
+        from unittest.mock import MagicMock
+        import meshtastic_telemetry_logger as logger
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outdir = Path(tmpdir)
+
+            def write_page(node_id, telemetry_data, traceroute_data, plot_outdir):
+                page = plot_outdir / f"node_{node_id.strip('!')}" / "index.html"
+                page.parent.mkdir(parents=True, exist_ok=True)
+                page.write_text("page")
+                return page
+
+            module = MagicMock()
+            module.update_node_pages.side_effect = write_page
+            module.create_status_indicator.return_value = {"text": "Active"}
+            telemetry = {"battery_pct": 85, "last_seen": "2024-01-01T00:00:00"}
+
+            logger._render_node_page(module, "!abc123", telemetry, None, outdir)
+            logger._render_node_page(module, "!abc123", dict(telemetry), None, outdir)
+            self.assertEqual(module.update_node_pages.call_count, 1)
+
+            # A node that reported again is rendered again
+            telemetry["last_seen"] = "2024-01-01T00:05:00"
+            logger._render_node_page(module, "!abc123", telemetry, None, outdir)
+            self.assertEqual(module.update_node_pages.call_count, 2)
+
+            # So is a page whose status badge has aged
+            module.create_status_indicator.return_value = {"text": "Recent"}
+            logger._render_node_page(module, "!abc123", telemetry, None, outdir)
+            self.assertEqual(module.update_node_pages.call_count, 3)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -3,7 +3,9 @@
 This is a manual update script for the dashboard.html to use our new grid layout.
 Updated to use standardized HTML templates for consistent styling.
 """
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import re
 import time
 import sys
 import os
@@ -15,16 +17,29 @@ try:
 except ImportError:
     print("[WARN] Could not import html_templates, using basic styling", file=sys.stderr)
 
+# Pattern for scraping existing node pages, compiled once and matched against
+# the raw page bytes so the whole file never has to be decoded. The title and
+# the info table rows are alternatives of one pattern so a single scan finds both.
+_PAGE_FIELDS_RE = re.compile(
+    rb'<h3>(?P<title>[^<]+)<span'
+    rb'|<td[^>]*><strong>(?P<field>[^<]+)</strong></td>\s*<td[^>]*>(?P<value>[^<]+)</td>'
+)
+# Number of info table rows considered for the card summary
+_INFO_ROW_LIMIT = 3
+
 def update_dashboard():
     print("Updating dashboards.html with new grid layout...")
     plot_dir = Path("plots")
     
     # Find all node directories, excluding example nodes
-    node_dirs = [d for d in plot_dir.glob("node_*") if d.is_dir() and not d.name.startswith("node_example")]
+    node_dirs = _list_node_dirs(plot_dir)
     print(f"Found {len(node_dirs)} non-example node directories")
     
+    # Read every node page once; both builders below share the results
+    nodes = _scrape_node_pages(node_dirs)
+    
     # Build the content using standardized template
-    content = _build_dashboard_content(node_dirs)
+    content = _build_dashboard_content(nodes)
     
     # Navigation links
     navigation = [
@@ -42,7 +57,7 @@ def update_dashboard():
         )
     except NameError:
         # Fallback if template import failed
-        html_content = _fallback_dashboard_html(node_dirs)
+        html_content = _fallback_dashboard_html(nodes)
     
     # Write the dashboard HTML
     dashboard_path = plot_dir / "dashboards.html"
@@ -53,9 +68,91 @@ def update_dashboard():
     
     print(f"Updated dashboards.html at {dashboard_path}")
 
-def _build_dashboard_content(node_dirs):
+def _list_node_dirs(plot_dir):
+    """Return node directory paths (as plain strings) in plot_dir using a single scan.
+    
+    DirEntry.is_dir() is answered from the directory listing itself, so this
+    avoids the extra stat per entry that glob() + Path.is_dir() costs.
+    """
+    try:
+        with os.scandir(plot_dir) as it:
+            return [e.path for e in it
+                    if e.name.startswith("node_") and not e.name.startswith("node_example") and e.is_dir()]
+    except FileNotFoundError:
+        return []
+
+def _scrape_node_pages(node_dirs):
+    """Read each node page once and extract the title and a short info summary.
+    
+    Pages are independent, so they are read on a small thread pool; the work is
+    almost entirely file I/O, which releases the GIL.
+    
+    Returns:
+        List of dicts with 'dir', 'id', 'title' and 'info' keys, sorted by directory
+    """
+    node_dirs = sorted(node_dirs)
+    if len(node_dirs) < 2:
+        return [_scrape_node_page(d) for d in node_dirs]
+    with ThreadPoolExecutor(max_workers=min(8, len(node_dirs))) as executor:
+        return list(executor.map(_scrape_node_page, node_dirs))
+
+def _read_page(path):
+    """Read a whole page with a single os.read sized from fstat, or None if missing."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    try:
+        return os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+
+def _scrape_node_page(node_dir):
+    """Extract the title and info summary from a single node page."""
+    dir_name = os.path.basename(node_dir)
+    node_id = "!" + dir_name.replace("node_", "")
+    
+    # Try to read some basic info from the node's data file if it exists
+    node_title = "Node"
+    node_info = ""
+    try:
+        content = _read_page(os.path.join(node_dir, "index.html"))
+        if content is not None:
+            # Try to extract title or user info if available, stopping as soon
+            # as the title and the first few info rows have been seen; the
+            # literal checks skip the scan on pages without the markup at all
+            title = None
+            info_rows = []
+            if b'<h3>' in content or b'<strong>' in content:
+                for match in _PAGE_FIELDS_RE.finditer(content):
+                    if match.lastgroup == 'title':
+                        if title is None:
+                            title = match['title']
+                    elif len(info_rows) < _INFO_ROW_LIMIT:
+                        info_rows.append((match['field'], match['value']))
+                    if title is not None and len(info_rows) == _INFO_ROW_LIMIT:
+                        break
+            
+            if title is not None:
+                node_title = title.decode("utf-8").strip()
+            
+            # Show first few info items
+            info_items = []
+            for field, value in info_rows:
+                field = field.decode("utf-8")
+                value = value.decode("utf-8")
+                if field not in ['Node ID'] and value != 'N/A':
+                    info_items.append(f"{field}: {value}")
+            if info_items:
+                node_info = " • ".join(info_items)
+    except Exception as e:
+        print(f"[DEBUG] Could not extract info for {node_id}: {e}")
+    
+    return {'dir': dir_name, 'id': node_id, 'title': node_title, 'info': node_info}
+
+def _build_dashboard_content(nodes):
     """Build the main dashboard content with node cards."""
-    if not node_dirs:
+    if not nodes:
         return """
         <div class="section">
             <h2>📊 Node Dashboards</h2>
@@ -65,35 +162,10 @@ def _build_dashboard_content(node_dirs):
     
     # Build node cards
     node_cards = []
-    for node_dir in sorted(node_dirs):
-        node_id = "!" + node_dir.name.replace("node_", "")
-        
-        # Try to read some basic info from the node's data file if it exists
-        node_title = "Node"
-        node_info = ""
-        try:
-            index_path = node_dir / "index.html"
-            if index_path.exists():
-                with open(index_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    # Try to extract title or user info if available
-                    import re
-                    title_match = re.search(r'<h3>([^<]+)<span', content)
-                    if title_match:
-                        node_title = title_match.group(1).strip()
-                    
-                    # Try to extract some basic info
-                    info_matches = re.findall(r'<td[^>]*><strong>([^<]+)</strong></td>\s*<td[^>]*>([^<]+)</td>', content)
-                    if info_matches:
-                        # Show first few info items
-                        info_items = []
-                        for field, value in info_matches[:3]:
-                            if field not in ['Node ID'] and value != 'N/A':
-                                info_items.append(f"{field}: {value}")
-                        if info_items:
-                            node_info = " • ".join(info_items)
-        except Exception as e:
-            print(f"[DEBUG] Could not extract info for {node_id}: {e}")
+    for node in nodes:
+        node_id = node['id']
+        node_title = node['title']
+        node_info = node['info']
         
         node_cards.append(f"""
         <div class="metric-card" style="min-height: 120px;">
@@ -103,7 +175,7 @@ def _build_dashboard_content(node_dirs):
             </div>
             {f'<p style="font-size: 0.9em; color: #666; margin: 8px 0;">{node_info}</p>' if node_info else ''}
             <div style="margin-top: auto;">
-                <a href="{node_dir.name}/index.html" class="nav-link" style="display: inline-block; margin: 0; padding: 8px 16px; font-size: 0.9em;">
+                <a href="{node['dir']}/index.html" class="nav-link" style="display: inline-block; margin: 0; padding: 8px 16px; font-size: 0.9em;">
                     📈 View Details
                 </a>
             </div>
@@ -116,7 +188,7 @@ def _build_dashboard_content(node_dirs):
         <p>Individual node dashboards with telemetry data, charts, and routing information.</p>
         
         <div style="text-align: center; margin: 20px 0; padding: 15px; background: #e3f2fd; border-radius: 8px;">
-            <strong>{len(node_dirs)} nodes</strong> with dashboard data available
+            <strong>{len(nodes)} nodes</strong> with dashboard data available
         </div>
         
         <div class="metrics-grid">
@@ -125,33 +197,16 @@ def _build_dashboard_content(node_dirs):
     </div>
     """
 
-def _fallback_dashboard_html(node_dirs):
+def _fallback_dashboard_html(nodes):
     """Fallback HTML if the standardized template import fails."""
     timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
     
-    cards_html = ""
-    for node_dir in sorted(node_dirs):
-        node_id = "!" + node_dir.name.replace("node_", "")
-        node_title = "Node"
-        
-        try:
-            index_path = node_dir / "index.html"
-            if index_path.exists():
-                with open(index_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    import re
-                    title_match = re.search(r'<h3>([^<]+)<span', content)
-                    if title_match:
-                        node_title = title_match.group(1).strip()
-        except Exception:
-            pass
-        
-        cards_html += f"""
+    cards_html = "".join(f"""
         <div class="node-card">
-            <h3>{node_title} <span class="node-id">{node_id}</span></h3>
-            <a href="{node_dir.name}/index.html" class="view-btn">View Details</a>
+            <h3>{node['title']} <span class="node-id">{node['id']}</span></h3>
+            <a href="{node['dir']}/index.html" class="view-btn">View Details</a>
         </div>
-        """
+        """ for node in nodes)
     
     return f"""<!doctype html>
 <meta charset='utf-8'>
@@ -199,7 +254,7 @@ body {{font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5;}}
 }}
 </style>
 <h1>Node Dashboards</h1>
-<p>Last updated: {timestamp} - {len(node_dirs)} nodes</p>
+<p>Last updated: {timestamp} - {len(nodes)} nodes</p>
 <p><a href="index.html">Back to index</a></p>
 
 <div class="dashboard-grid">
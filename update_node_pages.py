@@ -9,9 +9,12 @@ Updated to use standardized HTML templates for consistent styling across all pag
 
 import sys
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Optional
 
+from core import write_atomic
+
 # Add core module to path for template imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'core'))
 try:
@@ -71,10 +74,10 @@ def update_node_pages(node_id, telemetry_data=None, traceroute_data=None, output
         # Fallback to basic HTML if template import failed
         html_content = _fallback_html_template(node_id, content)
     
-    # Write HTML to file
+    # Write HTML to a temp file and rename it into place so readers (and a
+    # SIGINT mid-write) never leave a torn page behind
     index_path = os.path.join(node_dir, "index.html")
-    with open(index_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
+    write_atomic(index_path, html_content.encode("utf-8"))
     
     print(f"[DEBUG] Updated node page at {index_path}")
     return index_path
@@ -302,8 +305,12 @@ def _build_telemetry_section(telemetry_data):
     </div>
     """
 
+@lru_cache(maxsize=1)
 def _build_charts_section():
-    """Build the charts section with all telemetry chart images."""
+    """Build the charts section with all telemetry chart images.
+    
+    The section is identical for every node, so it is built once and reused.
+    """
     charts = [
         ('battery.png', '🔋 Battery Level'),
         ('voltage.png', '⚡ Voltage'),